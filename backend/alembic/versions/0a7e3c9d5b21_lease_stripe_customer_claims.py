@@ -0,0 +1,28 @@
+"""lease stripe customer claims
+
+Revision ID: 0a7e3c9d5b21
+Revises: f4c1d7a2b8e5
+Create Date: 2026-10-18 16:41:09.362751
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7e3c9d5b21'
+down_revision: Union[str, Sequence[str], None] = 'f4c1d7a2b8e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('stripe_claimed_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'stripe_claimed_until')
@@ -0,0 +1,32 @@
+"""index lower user email
+
+Revision ID: c5f0e8d21b7a
+Revises: 7d41c2a9e6b3
+Create Date: 2026-10-18 11:02:17.903215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f0e8d21b7a'
+down_revision: Union[str, Sequence[str], None] = '7d41c2a9e6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails on addresses that only differ by case; merge those accounts before upgrading
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.drop_constraint('users_email_key', 'users', type_='unique')
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.create_unique_constraint('users_email_key', 'users', ['email'])
@@ -0,0 +1,34 @@
+"""defer stripe customer provisioning
+
+Revision ID: e2b6a4d9f103
+Revises: c5f0e8d21b7a
+Create Date: 2026-10-18 12:14:51.228417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6a4d9f103'
+down_revision: Union[str, Sequence[str], None] = 'c5f0e8d21b7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('users', 'stripe_customer_id', existing_type=sa.String(), nullable=True)
+    op.create_index(
+        'ix_users_stripe_customer_pending', 'users', ['id'], unique=False,
+        postgresql_where=sa.text('stripe_customer_id IS NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows still waiting for a customer must be provisioned before the column can be NOT NULL again
+    op.drop_index('ix_users_stripe_customer_pending', table_name='users', postgresql_where=sa.text('stripe_customer_id IS NULL'))
+    op.alter_column('users', 'stripe_customer_id', existing_type=sa.String(), nullable=False)
@@ -1,3 +1,10 @@
+import argparse
+import glob
+import importlib.util
+import logging
+import os
+import tempfile
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import uvicorn
 from starlette.middleware.sessions import SessionMiddleware
@@ -5,9 +12,64 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from src.routes import api_router
 from src.config import settings
+from src.core import password_hasher, MemoryWatchdog, registry
+from src.db.session import engine
+from src.db import PostgresRateLimitBackend
+from src.db.repositories import user_cache_listener
+from src.dependencies import rate_limit_backend
+from src.services import google_oidc, get_stripe, get_oauth
+from src.middleware import AdmissionControlMiddleware, MetricsMiddleware, admission_controller
 
-app = FastAPI(title=settings.PROJECT_NAME)
+logger = logging.getLogger(__name__)
 
+memory_watchdog = MemoryWatchdog(settings.SERVER_MAX_WORKER_MEMORY_MB * 1024 * 1024)
+
+def load_sdks():
+    """Import the SDKs the handlers use lazily, so the first request in a worker does not block the loop on them."""
+    get_stripe()
+    get_oauth()
+    importlib.import_module("livekit.api")
+    importlib.import_module("httpx")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Already done in gunicorn's arbiter, then this is free; otherwise it runs once here before serving
+    load_sdks()
+    password_hasher.start()
+    # The watchdog recycles a worker by terminating it, which only helps when something starts a replacement
+    if settings.SERVER_SUPERVISED:
+        memory_watchdog.start()
+    elif settings.SERVER_MAX_WORKER_MEMORY_MB:
+        logger.warning("SERVER_MAX_WORKER_MEMORY_MB is ignored without a supervisor to restart the worker")
+    google_oidc.start()
+    if user_cache_listener is not None:
+        user_cache_listener.start()
+    if isinstance(rate_limit_backend, PostgresRateLimitBackend):
+        rate_limit_backend.start()
+    if settings.METRICS_MULTIPROCESS_DIR:
+        registry.start_dumping(settings.METRICS_MULTIPROCESS_DIR, settings.METRICS_DUMP_INTERVAL)
+    yield
+    if settings.METRICS_MULTIPROCESS_DIR:
+        registry.stop_dumping(settings.METRICS_MULTIPROCESS_DIR)
+    google_oidc.stop()
+    if user_cache_listener is not None:
+        user_cache_listener.stop()
+    if isinstance(rate_limit_backend, PostgresRateLimitBackend):
+        rate_limit_backend.stop()
+    memory_watchdog.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+
+# Added first so it sits innermost and its 503s still carry CORS headers
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        priorities=settings.ADMISSION_PRIORITIES
+    )
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.STATIC_ALLOWED_ORIGINS,
@@ -23,9 +85,80 @@ app.include_router(api_router)
 async def health_check():
     return {"status": "healthy"}
 
-if __name__ == "__main__":
+def prepare_metrics_dir():
+    """Give the workers a shared, empty directory to exchange metric dumps through."""
+    directory = settings.METRICS_MULTIPROCESS_DIR or tempfile.mkdtemp(prefix="portfolio-metrics-")
+    os.makedirs(directory, exist_ok=True)
+    # Dumps left by a previous run would otherwise be added to this run's totals
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+    # The environment reaches uvicorn's spawned workers, the settings object gunicorn's forked ones
+    os.environ["METRICS_MULTIPROCESS_DIR"] = settings.METRICS_MULTIPROCESS_DIR = directory
+
+def run_gunicorn(host: str, port: int, workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            # Import the app once in the arbiter so forked workers share its pages and boot instantly
+            self.cfg.set("preload_app", True)
+            self.cfg.set("max_requests", settings.SERVER_MAX_REQUESTS)
+            self.cfg.set("max_requests_jitter", settings.SERVER_MAX_REQUESTS_JITTER)
+            self.cfg.set("graceful_timeout", settings.SERVER_GRACEFUL_TIMEOUT)
+            self.cfg.set("keepalive", settings.SERVER_KEEPALIVE_TIMEOUT)
+
+        def load(self):
+            # Runs once in the arbiter under preload_app, so every forked worker inherits the loaded SDKs
+            load_sdks()
+            return app
+
+    Application().run()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API server")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 starts one worker per CPU")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    logger.info(
+        "Starting %d worker(s) on %s:%d with %s loop and %s parser", workers, args.host, args.port,
+        "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "httptools" if importlib.util.find_spec("httptools") else "h11"
+    )
+
+    # Read by the password hasher in every worker to size its share of the cores
+    os.environ["SERVER_WORKERS"] = str(workers)
+    settings.SERVER_WORKERS = workers
+    if workers > 1:
+        prepare_metrics_dir()
+        # Both gunicorn and uvicorn's multiprocess manager respawn workers that exit
+        os.environ["SERVER_SUPERVISED"] = "true"
+        settings.SERVER_SUPERVISED = True
+
+    if workers > 1 and importlib.util.find_spec("gunicorn"):
+        run_gunicorn(args.host, args.port, workers)
+        return
+
+    # uvicorn's own supervisor when gunicorn is unavailable; it needs an import string and cannot preload
     uvicorn.run(
-        app,
-        port=settings.SERVER_PORT,
+        "api_server:app" if workers > 1 else app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        limit_max_requests=(settings.SERVER_MAX_REQUESTS or None) if workers > 1 else None,
+        limit_max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
         reload=False
     )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
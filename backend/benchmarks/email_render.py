@@ -0,0 +1,44 @@
+"""Compare building a verification email with email.mime against the precompiled MimeTemplate.
+
+Run from the backend directory: python -m benchmarks.email_render [iterations]
+"""
+import sys
+import timeit
+import tracemalloc
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from src.config import settings
+from src.services.smtp_service import verify_create_account_email, VERIFY_CREATE_ACCOUNT_TEXT, VERIFY_CREATE_ACCOUNT_HTML
+
+VALUES = {
+    "first_name": "Jane",
+    "last_name": "Doe",
+    "verification_url": f"https://{settings.DOMAIN}/verify?token=eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOjF9.c2lnbmF0dXJl&target=register"
+}
+
+def build_with_email_mime() -> bytes:
+    message = MIMEMultipart('alternative')
+    message['From'] = settings.SMTP_EMAIL_ADDRESS
+    message['To'] = "jane@example.com"
+    message['Subject'] = f"Verify your email for {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio"
+    message.attach(MIMEText(VERIFY_CREATE_ACCOUNT_TEXT.render(**VALUES), 'plain'))
+    message.attach(MIMEText(VERIFY_CREATE_ACCOUNT_HTML.render(**VALUES), 'html'))
+    return message.as_bytes()
+
+def build_with_template() -> bytes:
+    return verify_create_account_email.build("jane@example.com", **VALUES)
+
+def measure(fn, iterations: int) -> tuple[float, int]:
+    seconds = timeit.timeit(fn, number=iterations)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds / iterations * 1e6, peak
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for name, fn in (("email.mime", build_with_email_mime), ("MimeTemplate", build_with_template)):
+        per_message, peak = measure(fn, iterations)
+        print(f"{name:<14} {per_message:8.1f} us/message  {peak / 1024:7.1f} KiB peak")
@@ -0,0 +1,89 @@
+"""Measure API startup cost and fail when it exceeds the budget.
+
+Records the `python -X importtime` cost of importing api_server, checks that the lazily loaded SDKs stay
+out of it, and times a cold start to the first successful /health response.
+
+Run from the backend directory: python -m benchmarks.startup [--import-budget-ms N] [--health-budget-ms N]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Loaded by the lifespan (or gunicorn's arbiter) rather than at import, so importing the app must not pull them in
+LAZY_MODULES = ("stripe", "livekit", "authlib", "httpx")
+
+def measure_imports() -> tuple[float, list[tuple[int, str]], list[str]]:
+    probe = "import sys, api_server; print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, check=True
+    )
+    modules = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((int(cumulative), name))
+        if name == "api_server":
+            total_us = int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total_us / 1000, sorted(modules, reverse=True), loaded
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def measure_first_health(timeout: float) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "api_server.py", "--workers", "1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env={**os.environ, "PYTHONPATH": "."}
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"api_server exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--health-budget-ms", type=float, default=3000)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    failures = []
+    import_ms, modules, loaded = measure_imports()
+    print(f"import api_server: {import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for cumulative, name in modules[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    if import_ms > args.import_budget_ms:
+        failures.append("import time over budget")
+    if loaded:
+        failures.append(f"eagerly imported: {', '.join(loaded)}")
+
+    health_ms = measure_first_health(timeout=max(30, args.health_budget_ms / 1000 * 3))
+    print(f"cold start to first /health: {health_ms:.0f} ms (budget {args.health_budget_ms:.0f} ms)")
+    if health_ms > args.health_budget_ms:
+        failures.append("cold start over budget")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,27 @@
+import asyncio
+import logging
+import signal
+
+from src.services import email_dispatcher, stripe_provisioner, smtp_pool
+
+
+def stop():
+    email_dispatcher.stop()
+    stripe_provisioner.stop()
+
+
+async def main():
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+
+    smtp_pool.start()
+    try:
+        await asyncio.gather(email_dispatcher.run(), stripe_provisioner.run())
+    finally:
+        await smtp_pool.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
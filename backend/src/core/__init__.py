@@ -1,6 +1,50 @@
-from .security import get_password_hash, verify_password
+from .security import (
+    get_password_hash,
+    verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    password_hasher,
+    PasswordHasherBusy
+)
+from .geoip import GeoIPDatabase
+from .smtp import SMTPPool
+from .metrics import Histogram, Counter, MetricFamily, MetricsRegistry, registry, track_external_call
+from .templates import Template, MimeTemplate
+from .claims_cache import VerifiedClaimsCache
+from .cache import CacheBackend, InMemoryCacheBackend, TieredCache
+from .singleflight import SingleFlight, KeyedLocks
+from .watchdog import MemoryWatchdog, get_rss_bytes
+from .oidc import OIDCProviderCache
+from .rate_limit import RateLimited, RateLimitBackend, InMemoryRateLimitBackend, RateLimiter
 
 __all__ = [
     'get_password_hash',
-    'verify_password'
-]
\ No newline at end of file
+    'verify_password',
+    'get_password_hash_async',
+    'verify_password_async',
+    'password_hasher',
+    'PasswordHasherBusy',
+    'GeoIPDatabase',
+    'SMTPPool',
+    'Histogram',
+    'Counter',
+    'MetricFamily',
+    'MetricsRegistry',
+    'registry',
+    'track_external_call',
+    'Template',
+    'MimeTemplate',
+    'VerifiedClaimsCache',
+    'CacheBackend',
+    'InMemoryCacheBackend',
+    'TieredCache',
+    'SingleFlight',
+    'KeyedLocks',
+    'MemoryWatchdog',
+    'get_rss_bytes',
+    'OIDCProviderCache',
+    'RateLimited',
+    'RateLimitBackend',
+    'InMemoryRateLimitBackend',
+    'RateLimiter'
+]
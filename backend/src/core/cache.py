@@ -0,0 +1,93 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+from cachetools import TTLCache
+
+class CacheBackend(ABC):
+    """Shared cache tier (e.g. Redis) sitting behind the in-process one; values must round-trip unchanged."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local stand-in for a shared backend, for development and tests."""
+
+    def __init__(self, maxsize: int = 100000):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=float("inf"))
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (value, time.monotonic() + ttl)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+class TieredCache:
+    """Read-through helper: a bounded in-process LRU/TTL tier in front of an optional shared backend."""
+
+    def __init__(self, maxsize: int, ttl: float, backend: CacheBackend | None = None):
+        self.ttl = ttl
+        self.backend = backend
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any | None:
+        value = self._local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+        if self.backend is not None:
+            value = await self.backend.get(key)
+            if value is not None:
+                self.shared_hits += 1
+                self._local[key] = value
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any):
+        self._local[key] = value
+        if self.backend is not None:
+            await self.backend.set(key, value, self.ttl)
+
+    async def invalidate(self, key: str):
+        self._local.pop(key, None)
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def invalidate_local(self, key: str):
+        """Drop only this process's copy, for when another process already invalidated the shared tier."""
+        self._local.pop(key, None)
+
+    def clear_local(self):
+        self._local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "size": len(self._local),
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.local_hits + self.shared_hits) / lookups if lookups else 0.0
+        }
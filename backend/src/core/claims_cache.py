@@ -0,0 +1,51 @@
+import hashlib
+import threading
+import time
+from typing import Any
+from cachetools import TLRUCache
+
+class VerifiedClaimsCache:
+    """Bounded cache of already-validated token claims, each entry expiring with its token's `exp`.
+
+    cachetools caches are not thread-safe, so every access (including the expiry and LRU eviction it
+    triggers) happens under one lock.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache: TLRUCache = TLRUCache(maxsize=maxsize, ttu=lambda _key, value, _now: value[1], timer=time.time)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Any | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token: str, claims: Any, expires_at: float):
+        key = self._key(token)
+        if expires_at > time.time():
+            with self._lock:
+                self._cache[key] = (claims, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,186 @@
+import csv
+import ipaddress
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# File layout (all integers big-endian):
+#   header:    magic, ipv4 range count, ipv6 range count, country count
+#   countries: u16 length + utf-8 bytes, repeated
+#   ranges:    ipv4 table then ipv6 table, each record is start, end, u16 country index,
+#              sorted by start so a lookup is a binary search over fixed-size records
+MAGIC = b"GEOIP\x00\x00\x01"
+HEADER = struct.Struct(">8sIII")
+COUNTRY_LENGTH = struct.Struct(">H")
+COUNTRY_INDEX = struct.Struct(">H")
+
+
+class GeoIPDatabase:
+    def __init__(self, path: str, reload_interval: float = 60):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._mm: mmap.mmap | None = None
+        self._signature: tuple[int, int, int] | None = None
+        self._checked_at = 0.0
+        self._countries: list[str] = []
+        self._tables: dict[int, tuple[int, int, int]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._mm is not None
+
+    def lookup(self, ip: str | ipaddress.IPv4Address | ipaddress.IPv6Address) -> str | None:
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+
+        address = ipaddress.ip_address(ip) if isinstance(ip, str) else ip
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+
+        mm = self._mm
+        table = self._tables.get(address.version)
+        if mm is None or table is None:
+            return None
+
+        offset, count, width = table
+        record_size = width * 2 + COUNTRY_INDEX.size
+        key = address.packed
+
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = offset + mid * record_size
+            if mm[start:start + width] <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo == 0:
+            return None
+
+        start = offset + (lo - 1) * record_size
+        if key > mm[start + width:start + width * 2]:
+            return None
+
+        (index,) = COUNTRY_INDEX.unpack_from(mm, start + width * 2)
+        return self._countries[index]
+
+    def reload(self, force: bool = False) -> bool:
+        """Map the database file again if it changed on disk since the last load."""
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if self._mm is None and self._signature is None:
+                logger.warning("GeoIP database %s not found, country lookups will miss", self.path)
+                self._signature = (0, 0, 0)
+            return False
+
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if not force and signature == self._signature:
+            return False
+
+        try:
+            with open(self.path, "rb") as file:
+                mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            countries, tables = self._parse(mm)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error("Failed to load GeoIP database %s: %s", self.path, e)
+            return False
+
+        previous = self._mm
+        self._mm, self._countries, self._tables = mm, countries, tables
+        self._signature = signature
+        if previous is not None:
+            previous.close()
+
+        logger.info(
+            "Loaded GeoIP database %s (%d ipv4 ranges, %d ipv6 ranges)",
+            self.path, tables[4][1], tables[6][1]
+        )
+        return True
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = None
+        self._signature = None
+        self._tables = {}
+
+    @staticmethod
+    def _parse(mm: mmap.mmap) -> tuple[list[str], dict[int, tuple[int, int, int]]]:
+        magic, ipv4_count, ipv6_count, country_count = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("not a GeoIP database file")
+
+        offset = HEADER.size
+        countries = []
+        for _ in range(country_count):
+            (length,) = COUNTRY_LENGTH.unpack_from(mm, offset)
+            offset += COUNTRY_LENGTH.size
+            countries.append(mm[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        tables = {}
+        for version, count, width in ((4, ipv4_count, 4), (6, ipv6_count, 16)):
+            tables[version] = (offset, count, width)
+            offset += count * (width * 2 + COUNTRY_INDEX.size)
+
+        if offset > len(mm):
+            raise ValueError("truncated GeoIP database file")
+
+        return countries, tables
+
+
+def build_database(csv_path: str, output_path: str) -> int:
+    """Compile a `start_ip,end_ip,country` CSV into the binary range format read by GeoIPDatabase."""
+    ranges: dict[int, list[tuple[bytes, bytes, int]]] = {4: [], 6: []}
+    countries: dict[str, int] = {}
+
+    with open(csv_path, newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if len(row) < 3 or row[0].startswith("#"):
+                continue
+            try:
+                start = ipaddress.ip_address(row[0].strip())
+                end = ipaddress.ip_address(row[1].strip())
+            except ValueError:
+                continue
+            if start.version != end.version or start > end:
+                continue
+            country = row[2].strip()
+            index = countries.setdefault(country, len(countries))
+            ranges[start.version].append((start.packed, end.packed, index))
+
+    for table in ranges.values():
+        table.sort()
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(ranges[4]), len(ranges[6]), len(countries)))
+        for country in countries:
+            encoded = country.encode("utf-8")
+            file.write(COUNTRY_LENGTH.pack(len(encoded)))
+            file.write(encoded)
+        for version in (4, 6):
+            for start, end, index in ranges[version]:
+                file.write(start)
+                file.write(end)
+                file.write(COUNTRY_INDEX.pack(index))
+
+    # Replace atomically so running workers pick up the new file on their next reload check
+    os.replace(tmp_path, output_path)
+    return len(ranges[4]) + len(ranges[6])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("usage: python -m src.core.geoip build <ranges.csv> <output.bin>")
+        sys.exit(1)
+    total = build_database(sys.argv[2], sys.argv[3])
+    print(f"Wrote {total} ranges to {sys.argv[3]}")
@@ -0,0 +1,276 @@
+import asyncio
+import functools
+import glob
+import inspect
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Fixed-bucket latency histogram, cheap enough to update on every call."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative.append((bound, seen))
+        cumulative.append((float("inf"), self.count))
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": cumulative,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99)
+        }
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+class MetricFamily:
+    """A named metric with fixed label names; children are created on first use and updated in place."""
+
+    def __init__(self, name: str, kind: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.children: dict[tuple[str, ...], Histogram | Counter] = {}
+
+    def labels(self, *values: str) -> Histogram | Counter:
+        child = self.children.get(values)
+        if child is None:
+            child = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+            self.children[values] = child
+        return child
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# A collector returns (name, kind, help, [(labels, value)]) where value is a number or a Histogram
+Collector = Callable[[], Iterable[tuple[str, str, str, list[tuple[dict, "float | Histogram"]]]]]
+
+class MetricsRegistry:
+    """Holds metric families and renders them, plus any collected stats, in the Prometheus text format."""
+
+    def __init__(self):
+        self.families: dict[str, MetricFamily] = {}
+        self.collectors: list[Collector] = []
+        self._dump_task: asyncio.Task | None = None
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> MetricFamily:
+        return self.families.setdefault(name, MetricFamily(name, "histogram", help, labelnames, buckets))
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> MetricFamily:
+        return self.families.setdefault(name, MetricFamily(name, "counter", help, labelnames))
+
+    def add_collector(self, collector: Collector):
+        self.collectors.append(collector)
+
+    def collect(self) -> list[tuple[str, str, str, list[tuple[dict, float | dict]]]]:
+        """Every family and collector as plain data, histograms reduced to their cumulative buckets."""
+        families = []
+        for family in list(self.families.values()):
+            samples = [
+                (dict(zip(family.labelnames, values)), _sample_value(child if isinstance(child, Histogram) else child.value))
+                for values, child in list(family.children.items())
+            ]
+            families.append((family.name, family.kind, family.help, samples))
+        for collector in self.collectors:
+            for name, kind, help, samples in collector():
+                families.append((name, kind, help, [(labels, _sample_value(value)) for labels, value in samples]))
+        return families
+
+    @staticmethod
+    def _render_family(lines: list[str], name: str, kind: str, help: str, samples):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if isinstance(value, dict):
+                for bound, count in value["buckets"]:
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                suffix = "_total" if kind == "counter" and not name.endswith("_total") else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+    def _render(self, families) -> str:
+        lines: list[str] = []
+        for name, kind, help, samples in families:
+            self._render_family(lines, name, kind, help, samples)
+        lines.append("")
+        return "\n".join(lines)
+
+    def render(self) -> str:
+        return self._render(self.collect())
+
+    def dump(self, directory: str):
+        """Write this process's metrics to `directory` for render_multiprocess to merge."""
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.collect(), file)
+        os.replace(tmp_path, path)
+
+    def render_multiprocess(self, directory: str) -> str:
+        """Merge the dumps of every worker sharing `directory`, refreshing this worker's own first.
+
+        Counters and histograms are summed, including those of workers that have since exited, so totals
+        never go backwards when a worker is recycled. Gauges only make sense per live process and get a pid label.
+        """
+        self.dump(directory)
+        merged: dict[str, tuple[str, str, dict]] = {}
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            pid = os.path.basename(path)[:-len(".json")]
+            try:
+                with open(path, encoding="utf-8") as file:
+                    families = json.load(file)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(int(pid))
+            for name, kind, help, samples in families:
+                entries = merged.setdefault(name, (kind, help, {}))[2]
+                for labels, value in samples:
+                    if kind == "gauge":
+                        if not alive:
+                            continue
+                        labels = {**labels, "pid": pid}
+                    key = tuple(sorted(labels.items()))
+                    if key not in entries:
+                        entries[key] = (labels, value)
+                    elif isinstance(value, dict):
+                        entries[key] = (labels, _merge_histograms(entries[key][1], value))
+                    else:
+                        entries[key] = (labels, entries[key][1] + value)
+        return self._render([(name, kind, help, list(entries.values())) for name, (kind, help, entries) in merged.items()])
+
+    async def _dump_loop(self, directory: str, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.dump(directory)
+            except OSError as e:
+                logger.warning("Could not write metrics snapshot to %s: %s", directory, e)
+
+    def start_dumping(self, directory: str, interval: float = 5):
+        if self._dump_task is None:
+            self._dump_task = asyncio.create_task(self._dump_loop(directory, interval))
+
+    def stop_dumping(self, directory: str):
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            self._dump_task = None
+        # A final dump keeps this worker's counters in the totals after it exits
+        try:
+            self.dump(directory)
+        except OSError:
+            pass
+
+def _sample_value(value):
+    if isinstance(value, Histogram):
+        snapshot = value.snapshot()
+        return {"count": snapshot["count"], "sum": snapshot["sum"], "buckets": snapshot["buckets"]}
+    return value
+
+def _merge_histograms(a: dict, b: dict) -> dict:
+    return {
+        "count": a["count"] + b["count"],
+        "sum": a["sum"] + b["sum"],
+        "buckets": [(bound, count + other) for (bound, count), (_, other) in zip(a["buckets"], b["buckets"])]
+    }
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+registry = MetricsRegistry()
+
+external_call_seconds = registry.histogram(
+    "external_call_duration_seconds", "Latency of calls to external dependencies", ("service", "operation")
+)
+external_call_errors = registry.counter(
+    "external_call_errors_total", "Calls to external dependencies that raised", ("service", "operation")
+)
+
+def track_external_call(service: str, operation: str):
+    """Decorator timing a sync or async function into external_call_duration_seconds."""
+    histogram = external_call_seconds.labels(service, operation)
+    errors = external_call_errors.labels(service, operation)
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+class OIDCProviderCache:
+    """Discovery metadata and JWKS for one OpenID provider, persisted to disk and refreshed ahead of expiry."""
+
+    def __init__(
+        self,
+        issuer: str,
+        cache_path: str | None = None,
+        default_ttl: float = 3600,
+        refresh_margin: float = 300,
+        retry_interval: float = 30,
+        stagger: float = 30,
+        timeout: float = 5
+    ):
+        self.issuer = issuer.rstrip("/")
+        self.cache_path = cache_path
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.stagger = stagger
+        self.timeout = timeout
+        self.metadata: dict | None = None
+        self.jwks: dict | None = None
+        # Wall-clock expiry so it stays meaningful when read back from disk by another process
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.version = 0
+        self.fetches = 0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.metadata is not None and self.jwks is not None and time.time() < self.expires_at
+
+    def _ttl(self, response) -> float:
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        return float(match.group(1)) if match else self.default_ttl
+
+    def _apply(self, metadata: dict, jwks: dict, expires_at: float, refresh_at: float):
+        self.metadata, self.jwks = metadata, jwks
+        self.expires_at, self.refresh_at = expires_at, refresh_at
+        self.version += 1
+
+    def load(self) -> bool:
+        """Adopt the on-disk copy if it belongs to this issuer and is newer than what is in memory."""
+        if not self.cache_path:
+            return False
+        try:
+            with open(self.cache_path, encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if cached.get("issuer") != self.issuer or cached.get("expires_at", 0) <= self.expires_at:
+            return False
+        self._apply(cached["metadata"], cached["jwks"], cached["expires_at"], cached["refresh_at"])
+        return True
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({
+                    "issuer": self.issuer,
+                    "metadata": self.metadata,
+                    "jwks": self.jwks,
+                    "expires_at": self.expires_at,
+                    "refresh_at": self.refresh_at
+                }, file)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("Could not persist OIDC cache to %s: %s", self.cache_path, e)
+
+    async def refresh(self):
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(f"{self.issuer}/.well-known/openid-configuration")
+            response.raise_for_status()
+            metadata = response.json()
+            ttl = self._ttl(response)
+
+            response = await client.get(metadata["jwks_uri"])
+            response.raise_for_status()
+            jwks = response.json()
+            ttl = min(ttl, self._ttl(response))
+        self.fetches += 1
+        # Short-lived responses refresh halfway through rather than spinning on a margin longer than the ttl
+        now = time.time()
+        self._apply(metadata, jwks, now + ttl, now + max(ttl - self.refresh_margin, ttl / 2))
+        self._save()
+        logger.info("Refreshed OIDC metadata for %s, valid for %ds", self.issuer, ttl)
+
+    async def ensure(self) -> tuple[dict, dict]:
+        """Return metadata and JWKS, touching the network only when neither memory nor disk has a fresh copy."""
+        if not self.fresh:
+            async with self._lock:
+                if not self.fresh and not (self.load() and self.fresh):
+                    try:
+                        await self.refresh()
+                    except Exception:
+                        # Stale keys still verify tokens signed before a rotation, so prefer them to failing
+                        if self.metadata is None:
+                            raise
+                        logger.exception("OIDC refresh for %s failed, serving the stale copy", self.issuer)
+        return self.metadata, self.jwks
+
+    def _next_refresh_delay(self) -> float:
+        # Workers sharing the cache file wake at different times, so one fetches and the rest adopt its copy;
+        # the spread stays well inside whatever is left of the current copy's lifetime
+        now = time.time()
+        wake = max(self.refresh_at, now)
+        spread = min(self.stagger, (self.expires_at - wake) / 2) if self.fresh else self.stagger
+        return wake - now + random.uniform(0, max(spread, 0))
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self._next_refresh_delay())
+            # Another worker may already have refreshed the shared file
+            if self.load() and self.refresh_at > time.time():
+                continue
+            try:
+                async with self._lock:
+                    await self.refresh()
+            except Exception as e:
+                logger.warning("Background OIDC refresh for %s failed: %s", self.issuer, e)
+                await asyncio.sleep(self.retry_interval)
+
+    def start(self):
+        self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "fetches": self.fetches,
+            "expires_in": max(0.0, self.expires_at - time.time()),
+            "keys": len(self.jwks.get("keys", [])) if self.jwks else 0
+        }
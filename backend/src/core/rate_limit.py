@@ -0,0 +1,50 @@
+import time
+from abc import ABC, abstractmethod
+from cachetools import LRUCache
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class RateLimitBackend(ABC):
+    """Token bucket storage shared by every worker (e.g. Postgres running the refill-and-take in one statement)."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1) -> float:
+        """Take `cost` tokens from the bucket; return 0 when allowed, otherwise seconds until it would be."""
+        ...
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets; evicting a bucket only ever resets it to full."""
+
+    def __init__(self, maxsize: int = 100000):
+        self._buckets: LRUCache = LRUCache(maxsize=maxsize)
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (cost - tokens) / rate
+
+class RateLimiter:
+    def __init__(self, per_minute: float, burst: int, backend: RateLimitBackend):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.backend = backend
+        self.allowed = 0
+        self.limited = 0
+
+    async def hit(self, key: str, cost: float = 1):
+        retry_after = await self.backend.take(key, self.rate, self.burst, cost)
+        if retry_after > 0:
+            self.limited += 1
+            raise RateLimited(retry_after)
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {"allowed": self.allowed, "limited": self.limited}
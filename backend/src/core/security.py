@@ -1,9 +1,74 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 from passlib.context import CryptContext
 
+from src.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+class PasswordHasherBusy(Exception):
+    pass
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool so hashing uses every core and never blocks the event loop."""
+
+    def __init__(self, workers: int = 0, queue_depth: int = 64):
+        self.configured_workers = workers
+        self.queue_depth = queue_depth
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def workers(self) -> int:
+        # Every server worker runs its own pool, so by default they split the cores between them
+        if self.configured_workers:
+            return self.configured_workers
+        return max(1, (os.cpu_count() or 1) // max(1, settings.SERVER_WORKERS))
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.workers + self.queue_depth
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            # Start a pool process now so the first login does not pay for it
+            self._executor.submit(os.getpid).result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self.saturated:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.start()
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_DEPTH)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from email.message import Message
+from email.utils import getaddresses
+import aiosmtplib
+
+from .metrics import track_external_call
+
+logger = logging.getLogger(__name__)
+
+class SMTPPool:
+    """Keeps a bounded set of connected, authenticated SMTP sessions and reuses them across messages."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        size: int = 4,
+        use_tls: bool = False,
+        start_tls: bool = True,
+        timeout: float = 30,
+        keepalive_interval: float = 60
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.keepalive_interval = keepalive_interval
+        self._idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._keepalive_task: asyncio.Task | None = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self._slots
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        if self.username and self.password:
+            await client.login(self.username, self.password)
+        return client
+
+    @staticmethod
+    async def _discard(client: aiosmtplib.SMTP):
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def _is_alive(self, client: aiosmtplib.SMTP) -> bool:
+        if not client.is_connected:
+            return False
+        try:
+            await client.noop()
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self.keepalive_interval and client.is_connected:
+                return client
+            if await self._is_alive(client):
+                return client
+            await self._discard(client)
+        return await self._connect()
+
+    def _release(self, client: aiosmtplib.SMTP):
+        if client.is_connected:
+            self._idle.append((client, time.monotonic()))
+
+    @track_external_call("smtp", "sendmail")
+    async def sendmail(self, sender: str, recipients: list[str], message: bytes | str):
+        async with self._get_slots():
+            client = await self._acquire()
+            try:
+                try:
+                    await client.sendmail(sender, recipients, message)
+                except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                    # The pooled session died between the health check and the send, retry once on a fresh one
+                    client.close()
+                    client = await self._connect()
+                    await client.sendmail(sender, recipients, message)
+            except Exception:
+                await self._discard(client)
+                raise
+            self._release(client)
+
+    async def send_message(self, message: Message):
+        headers = message.get_all("To", []) + message.get_all("Cc", [])
+        recipients = [address for _, address in getaddresses(headers)]
+        await self.sendmail(message["From"], recipients, message.as_bytes())
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            idle, self._idle = self._idle, []
+            for client, last_used in idle:
+                if await self._is_alive(client):
+                    self._idle.append((client, time.monotonic()))
+                else:
+                    logger.info("Dropping stale SMTP connection to %s:%s", self.host, self.port)
+                    await self._discard(client)
+
+    def start(self):
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive())
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            await self._discard(client)
@@ -0,0 +1,97 @@
+import uuid
+from email.header import Header
+from email.quoprimime import body_encode
+from string import Formatter
+
+_formatter = Formatter()
+
+def _quoted_printable(text: str) -> bytes:
+    # quoprimime works on code points, so hand it the utf-8 bytes as latin-1 characters
+    return body_encode(text.encode("utf-8").decode("latin-1"), maxlinelen=76, eol="\r\n").encode("ascii")
+
+class Template:
+    """A str.format template whose static fields are resolved once, leaving literal fragments around the per-message fields."""
+
+    def __init__(self, source: str, static: dict | None = None):
+        static = static or {}
+        self.fragments: list[str] = []
+        self.fields: list[tuple[str, str | None, str]] = []
+
+        literal = []
+        for text, field_name, format_spec, conversion in _formatter.parse(source):
+            literal.append(text)
+            if field_name is None:
+                continue
+            root = field_name.split(".", 1)[0].split("[", 1)[0]
+            if root in static:
+                value, _ = _formatter.get_field(field_name, (), static)
+                value = _formatter.convert_field(value, conversion)
+                literal.append(_formatter.format_field(value, format_spec))
+            else:
+                self.fragments.append("".join(literal))
+                self.fields.append((field_name, conversion, format_spec))
+                literal = []
+        self.fragments.append("".join(literal))
+        self._encoded_fragments = [_quoted_printable(fragment) for fragment in self.fragments]
+
+    def _values(self, values: dict) -> list[str]:
+        rendered = []
+        for field_name, conversion, format_spec in self.fields:
+            value = values[field_name]
+            if conversion or format_spec:
+                value = _formatter.format_field(_formatter.convert_field(value, conversion), format_spec)
+            rendered.append(str(value))
+        return rendered
+
+    def render(self, **values) -> str:
+        parts = [self.fragments[0]]
+        for value, fragment in zip(self._values(values), self.fragments[1:]):
+            parts.append(value)
+            parts.append(fragment)
+        return "".join(parts)
+
+    def encode(self, **values) -> bytes:
+        """Render straight to a quoted-printable body, encoding only the per-message values."""
+        encoded = self._encoded_fragments
+        chunks = [encoded[0]]
+        for value, fragment in zip(self._values(values), encoded[1:]):
+            chunks.append(_quoted_printable(value))
+            chunks.append(fragment)
+        # Soft line breaks splice the separately encoded chunks back into one logical body
+        return b"=\r\n".join(chunk for chunk in chunks if chunk)
+
+class MimeTemplate:
+    """A multipart/alternative email with its headers, boundaries and static body text encoded ahead of time."""
+
+    def __init__(self, sender: str, subject: str, text: Template, html: Template | None = None):
+        self.sender = sender
+        self.text = text
+        self.html = html
+
+        boundary = f"==============={uuid.uuid4().hex}=="
+        self._head = (
+            f'Content-Type: multipart/alternative;\r\n boundary="{boundary}"\r\n'
+            f"MIME-Version: 1.0\r\n"
+            f"From: {sender}\r\n"
+            f"To: "
+        ).encode("ascii")
+        subject = subject if subject.isascii() else Header(subject, "utf-8", header_name="Subject").encode(linesep="\r\n")
+        self._subject = f"\r\nSubject: {subject}\r\n\r\n".encode("ascii")
+        part = (
+            f"--{boundary}\r\n"
+            'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            "MIME-Version: 1.0\r\n"
+            "Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+        )
+        self._text_head = part.format(subtype="plain").encode("ascii")
+        self._html_head = f"\r\n{part.format(subtype='html')}".encode("ascii")
+        self._tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    def build(self, recipient: str, **values) -> bytes:
+        to = recipient if recipient.isascii() else Header(recipient, "utf-8", header_name="To").encode(linesep="\r\n")
+        parts = [self._head, to.encode("ascii"), self._subject, self._text_head, self.text.encode(**values)]
+        if self.html is not None:
+            parts.append(self._html_head)
+            parts.append(self.html.encode(**values))
+        parts.append(self._tail)
+        return b"".join(parts)
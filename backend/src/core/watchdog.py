@@ -0,0 +1,46 @@
+import asyncio
+import logging
+import os
+import resource
+import signal
+
+logger = logging.getLogger(__name__)
+
+def get_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS, but still catches steady growth; kilobytes on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == "Darwin" else rss * 1024
+
+class MemoryWatchdog:
+    """Asks the current worker to shut down gracefully once its RSS passes a limit, so the supervisor replaces it."""
+
+    def __init__(self, limit_bytes: int, interval: float = 10):
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            rss = get_rss_bytes()
+            if rss > self.limit_bytes:
+                logger.warning(
+                    "Worker %d uses %d MiB (limit %d MiB), restarting it",
+                    os.getpid(), rss >> 20, self.limit_bytes >> 20
+                )
+                # SIGTERM goes through the server's normal drain of in-flight requests
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+
+    def start(self):
+        if self._task is None and self.limit_bytes > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -1,5 +1,11 @@
-from .session import get_db
+from .session import get_db, AsyncSessionLocal, get_pool_stats
+from .locks import advisory_xact_lock
+from .rate_limit import PostgresRateLimitBackend
 
 __all__ = [
-    "get_db"
-]
\ No newline at end of file
+    "get_db",
+    "AsyncSessionLocal",
+    "get_pool_stats",
+    "advisory_xact_lock",
+    "PostgresRateLimitBackend"
+]
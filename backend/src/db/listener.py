@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Callable
+
+from .session import engine
+
+logger = logging.getLogger(__name__)
+
+class NotificationListener:
+    """Runs `callback(payload)` for every NOTIFY on `channel`, over one dedicated connection outside the pool."""
+
+    def __init__(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_connect: Callable[[], None] | None = None,
+        retry_interval: float = 5
+    ):
+        self.channel = channel
+        self.callback = callback
+        # Notifications sent while disconnected are lost, so this lets the owner drop whatever they may have covered
+        self.on_connect = on_connect
+        self.retry_interval = retry_interval
+        self.received = 0
+        self._task: asyncio.Task | None = None
+
+    def _notified(self, connection, pid, channel, payload):
+        self.received += 1
+        self.callback(payload)
+
+    async def _listen(self):
+        import asyncpg
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except Exception as e:
+                logger.warning("Could not connect to LISTEN on %s: %s", self.channel, e)
+                await asyncio.sleep(self.retry_interval)
+                continue
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(self.channel, self._notified)
+                if self.on_connect is not None:
+                    self.on_connect()
+                await lost.wait()
+                logger.warning("LISTEN connection for %s dropped, reconnecting", self.channel)
+            finally:
+                await connection.close()
+            await asyncio.sleep(self.retry_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
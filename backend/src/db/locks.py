@@ -0,0 +1,20 @@
+import asyncio
+import hashlib
+import time
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def _lock_id(key: str) -> int:
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big", signed=True)
+
+async def advisory_xact_lock(db: AsyncSession, key: str, timeout: float = 5, poll_interval: float = 0.05):
+    """Take a transaction-level advisory lock on `key` through `db`, released by its next commit or rollback.
+
+    Polls pg_try_advisory_xact_lock instead of blocking so a stuck holder costs the caller `timeout` at most.
+    """
+    lock_id = _lock_id(key)
+    deadline = time.monotonic() + timeout
+    while not (await db.execute(select(func.pg_try_advisory_xact_lock(lock_id)))).scalar():
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"advisory lock {key!r} not acquired within {timeout}s")
+        await asyncio.sleep(poll_interval)
@@ -1,7 +1,11 @@
 from .base import Base
 from .user import User
+from .email_outbox import EmailOutbox
+from .rate_limit_bucket import RateLimitBucket
 
 __all__ = [
     "Base",
-    "User"
-]
\ No newline at end of file
+    "User",
+    "EmailOutbox",
+    "RateLimitBucket"
+]
@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Enum, DateTime, JSON, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.enums import EmailTemplate, EmailStatus
+from .base import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    template: Mapped[EmailTemplate] = mapped_column(Enum(EmailTemplate), nullable=False)
+    recipient: Mapped[str] = mapped_column(String, nullable=False)
+    context: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[EmailStatus] = mapped_column(Enum(EmailStatus), nullable=False, default=EmailStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import String, Float
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    # Losing the buckets on a crash only resets them to full, so skip the WAL
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    # Theoretical arrival time (epoch seconds) of the next request; the bucket is full once it is in the past
+    tat: Mapped[float] = mapped_column(Float, nullable=False)
@@ -1,4 +1,5 @@
-from sqlalchemy import String, Integer, Boolean, Enum, ForeignKey
+from datetime import datetime
+from sqlalchemy import String, Integer, Boolean, Enum, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.enums import UserRole, UserTier
@@ -8,7 +9,7 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(Integer, nullable=False, unique=True, index=True, primary_key=True, autoincrement=True)
-    email: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    email: Mapped[str] = mapped_column(String, nullable=False)
     first_name: Mapped[str] = mapped_column(String, nullable=False)
     last_name: Mapped[str] = mapped_column(String, nullable=False)
     avatar: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -16,8 +17,15 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False, default=UserRole.USER)
     tier: Mapped[UserTier] = mapped_column(Enum(UserTier), nullable=False, default=UserTier.FREE)
-    stripe_customer_id: Mapped[str] = mapped_column(String, nullable=False)
+    # NULL until the jobs server (or a billing flow) provisions the Stripe customer
+    stripe_customer_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Set while a provisioner is talking to Stripe for this user, so others skip it without holding a row lock
+    stripe_claimed_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     blocked: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     verified: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     
-    # usage_id: Mapped[int] = mapped_column(ForeignKey("usages.id"), nullable=True, unique=True)
\ No newline at end of file
+    # usage_id: Mapped[int] = mapped_column(ForeignKey("usages.id"), nullable=True, unique=True)
+
+# Emails are stored lowercased; the functional index keeps lookups through lower(email) a single probe
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+Index("ix_users_stripe_customer_pending", User.id, postgresql_where=User.stripe_customer_id.is_(None))
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from sqlalchemy import text
+
+from src.core import RateLimitBackend
+from .session import engine
+
+logger = logging.getLogger(__name__)
+
+# GCRA, which admits exactly what a token bucket of the same rate and burst would; a refused request changes nothing
+_TAKE = text("""
+    INSERT INTO rate_limit_buckets AS b (key, tat)
+    VALUES (:key, extract(epoch FROM clock_timestamp()) + :increment)
+    ON CONFLICT (key) DO UPDATE
+        SET tat = greatest(b.tat, extract(epoch FROM clock_timestamp())) + :increment
+        WHERE greatest(b.tat, extract(epoch FROM clock_timestamp())) + :increment
+            <= extract(epoch FROM clock_timestamp()) + :capacity
+    RETURNING tat
+""")
+_RETRY_AFTER = text("""
+    SELECT tat + :increment - :capacity - extract(epoch FROM clock_timestamp())
+    FROM rate_limit_buckets WHERE key = :key
+""")
+_PRUNE = text("DELETE FROM rate_limit_buckets WHERE tat < extract(epoch FROM clock_timestamp())")
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """Buckets in an unlogged table, so every worker and replica draws from the same limit."""
+
+    def __init__(self, prune_interval: float = 300):
+        self.prune_interval = prune_interval
+        self._task: asyncio.Task | None = None
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1) -> float:
+        params = {"key": key, "increment": cost / rate, "capacity": burst / rate}
+        async with engine.begin() as connection:
+            if (await connection.execute(_TAKE, params)).first() is not None:
+                return 0.0
+            retry_after = (await connection.execute(_RETRY_AFTER, params)).scalar()
+        # The bucket may have refilled between the two statements
+        return max(retry_after or 0.0, 0.001)
+
+    async def _prune_loop(self):
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                async with engine.begin() as connection:
+                    await connection.execute(_PRUNE)
+            except Exception as e:
+                logger.warning("Could not prune rate limit buckets: %s", e)
+
+    def start(self):
+        # Buckets whose arrival time has passed are full, which is the same as having no row
+        if self._task is None:
+            self._task = asyncio.create_task(self._prune_loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
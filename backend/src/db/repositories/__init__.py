@@ -1,5 +1,10 @@
-from .user import UserRepository
+from .user import UserRepository, normalize_email, get_user_cache_stats, user_cache_listener
+from .email_outbox import EmailOutboxRepository
 
 __all__ = [
-    "UserRepository"
-]
\ No newline at end of file
+    "UserRepository",
+    "EmailOutboxRepository",
+    "normalize_email",
+    "get_user_cache_stats",
+    "user_cache_listener"
+]
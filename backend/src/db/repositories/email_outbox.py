@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+
+from src.db.models import EmailOutbox
+from src.enums import EmailTemplate, EmailStatus
+
+class EmailOutboxRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, template: EmailTemplate, recipient: str, context: dict) -> EmailOutbox:
+        email = EmailOutbox(template=template, recipient=recipient, context=context)
+        try:
+            self.db.add(email)
+            await self.db.commit()
+            return email
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+
+    async def claim_batch(self, limit: int, lease: timedelta) -> list[EmailOutbox]:
+        """Lock due emails and push their next attempt past the lease so other dispatchers skip them."""
+        now = datetime.now(timezone.utc)
+        stmt = (
+            select(EmailOutbox)
+            .where(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(stmt)
+        emails = list(result.scalars().all())
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + lease
+        await self.db.commit()
+        return emails
+
+    async def renew_lease(self, ids: list[int], lease: timedelta):
+        """Push the next attempt of still-pending emails out by another lease."""
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids), EmailOutbox.status == EmailStatus.PENDING)
+            .values(next_attempt_at=datetime.now(timezone.utc) + lease)
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def complete_batch(
+        self,
+        sent: list[EmailOutbox],
+        failed: list[tuple[EmailOutbox, str, datetime | None]]
+    ):
+        """Record a dispatched batch; failures without a retry time are dead-lettered."""
+        now = datetime.now(timezone.utc)
+        for email in sent:
+            email.status = EmailStatus.SENT
+            email.sent_at = now
+            email.last_error = None
+        for email, error, retry_at in failed:
+            email.last_error = error[:1000]
+            if retry_at is None:
+                email.status = EmailStatus.DEAD
+            else:
+                email.next_attempt_at = retry_at
+        await self.db.commit()
+
+    async def count_by_status(self) -> dict[EmailStatus, int]:
+        stmt = select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)
+        result = await self.db.execute(stmt)
+        return {status: count for status, count in result.all()}
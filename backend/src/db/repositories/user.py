@@ -1,24 +1,133 @@
+from datetime import timedelta
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func, or_, inspect
+from sqlalchemy.orm import make_transient_to_detached
 
+from src.config import settings
+from src.core import TieredCache
 from src.db.models import User
+from src.db.listener import NotificationListener
+
+USER_CACHE_CHANNEL = "user_cache_invalidate"
+
+user_cache: TieredCache | None = (
+    TieredCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+    if settings.USER_CACHE_ENABLED else None
+)
+# Every worker drops its local copy when any process commits a change to that user
+user_cache_listener: NotificationListener | None = (
+    NotificationListener(USER_CACHE_CHANNEL, user_cache.invalidate_local, on_connect=user_cache.clear_local)
+    if user_cache is not None else None
+)
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def _snapshot(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
 
 class UserRepository:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: TieredCache | None = None):
         self.db = db
+        self.cache = cache if cache is not None else user_cache
 
     async def get_by_email(self, email: str) -> Optional[User]:
-        stmt = select(User).where(User.email == email)
+        email = normalize_email(email)
+        if self.cache is not None:
+            snapshot = await self.cache.get(email)
+            if snapshot is not None:
+                # Attach a clean copy to this session without a round-trip so callers can still update it
+                user = User(**snapshot)
+                make_transient_to_detached(user)
+                return await self.db.merge(user, load=False)
+
+        stmt = select(User).where(func.lower(User.email) == email)
         result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        if user is not None and self.cache is not None:
+            await self.cache.set(email, _snapshot(user))
+        return user
+
+    async def _notify_changed(self, emails: list[str]):
+        # Sent inside the transaction, so other workers only hear about it once it commits
+        for email in emails:
+            await self.db.execute(select(func.pg_notify(USER_CACHE_CHANNEL, email)))
 
     async def create_or_update_user(self, user: User) -> User:
         try:
+            user.email = normalize_email(user.email)
             self.db.add(user)
+            if self.cache is not None:
+                await self._notify_changed([user.email])
             await self.db.commit()
             await self.db.refresh(user)
-            return user
         except Exception as e:
             await self.db.rollback()
-            raise e
\ No newline at end of file
+            raise e
+        if self.cache is not None:
+            await self.cache.invalidate(user.email)
+        return user
+
+    async def get_fresh_by_email(self, email: str) -> Optional[User]:
+        """Load a user straight from the database, bypassing the cache, and end the read transaction."""
+        stmt = (
+            select(User)
+            .where(func.lower(User.email) == normalize_email(email))
+            .execution_options(populate_existing=True)
+        )
+        user = (await self.db.execute(stmt)).scalar_one_or_none()
+        await self.db.commit()
+        return user
+
+    async def claim_pending_stripe_customers(
+        self,
+        limit: int,
+        lease: float,
+        exclude: list[int] | None = None,
+        only: list[int] | None = None
+    ) -> list[User]:
+        """Lease users still waiting for a Stripe customer for `lease` seconds and commit, so no row lock outlives this call.
+
+        Users leased by another provisioner are skipped until their lease runs out. `only` restricts the claim
+        to the given users, for provisioning one on demand.
+        """
+        now = func.now()
+        candidates = select(User.id).where(
+            User.stripe_customer_id.is_(None),
+            or_(User.stripe_claimed_until.is_(None), User.stripe_claimed_until < now)
+        )
+        if exclude:
+            candidates = candidates.where(User.id.notin_(exclude))
+        if only is not None:
+            candidates = candidates.where(User.id.in_(only))
+        candidates = candidates.order_by(User.id).limit(limit).with_for_update(skip_locked=True)
+        stmt = (
+            update(User)
+            .where(User.id.in_(candidates.scalar_subquery()))
+            .values(stripe_claimed_until=now + timedelta(seconds=lease))
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            users = list((await self.db.scalars(stmt)).all())
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return sorted(users, key=lambda user: user.id)
+
+    async def save_users(self, users: list[User]):
+        try:
+            if self.cache is not None:
+                await self._notify_changed([user.email for user in users])
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        if self.cache is not None:
+            for user in users:
+                await self.cache.invalidate(user.email)
+
+def get_user_cache_stats() -> dict | None:
+    return user_cache.stats() if user_cache is not None else None
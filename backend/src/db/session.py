@@ -1,11 +1,102 @@
+import re
+import time
+from functools import lru_cache
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from src.config import settings
+from src.core import Histogram, registry
+
+POOL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class PoolTelemetry:
+    def __init__(self):
+        self.checkout_wait = Histogram(POOL_BUCKETS)
+        self.connect_latency = Histogram(POOL_BUCKETS)
+        self.checkout_timeouts = 0
+
+telemetry = PoolTelemetry()
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait and how long new connections take."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            telemetry.checkout_timeouts += 1
+            raise
+        finally:
+            telemetry.checkout_wait.observe(time.perf_counter() - started)
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            telemetry.connect_latency.observe(time.perf_counter() - started)
+
+connect_args = {
+    "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    "command_timeout": settings.DB_COMMAND_TIMEOUT
+}
+if settings.DB_STATEMENT_TIMEOUT:
+    connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)}
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=connect_args
+)
+query_seconds = registry.histogram("db_query_duration_seconds", "Query latency by statement shape", ("statement",), POOL_BUCKETS)
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)', re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """Collapse a statement to its verb and first table, e.g. `SELECT users`, to keep label cardinality low."""
+    words = statement.split(None, 1)
+    verb = words[0].upper() if words else "OTHER"
+    match = _TABLE.search(statement)
+    return f"{verb} {match.group(1)}" if match else verb
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    query_seconds.labels(statement_shape(statement)).observe(time.perf_counter() - started)
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _drop_query_timer(context):
+    # after_cursor_execute never fires for a failed statement
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
 
-engine = create_async_engine(settings.DATABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkout_timeouts": telemetry.checkout_timeouts,
+        "checkout_wait": telemetry.checkout_wait.snapshot(),
+        "connect_latency": telemetry.connect_latency.snapshot()
+    }
+
 async def get_db():
     async with AsyncSessionLocal() as db:
-        yield db
\ No newline at end of file
+        yield db
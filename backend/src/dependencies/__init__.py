@@ -1,8 +1,15 @@
 from .user_service import get_user_service
 from .jwt_service import get_current_user, get_verifying_user
+from .rate_limit import get_client_ip, limit_by_ip, limit_by_email, shed_hash_load, get_rate_limit_stats, rate_limit_backend
 
 __all__ = [
     "get_user_service",
     "get_current_user",
-    "get_verifying_user"
+    "get_verifying_user",
+    "get_client_ip",
+    "limit_by_ip",
+    "limit_by_email",
+    "shed_hash_load",
+    "get_rate_limit_stats",
+    "rate_limit_backend"
 ]
\ No newline at end of file
@@ -3,77 +3,71 @@ from jose import JWTError, jwt
 
 from src.schemas import oauth2_scheme, UserData
 from src.config import settings
-from src.enums import UserRole, UserTier
+from src.core import VerifiedClaimsCache
+from src.services import get_user_data_from_claims
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+auth_claims_cache = VerifiedClaimsCache(settings.JWT_CLAIMS_CACHE_SIZE)
+verify_claims_cache = VerifiedClaimsCache(settings.JWT_CLAIMS_CACHE_SIZE)
+
+# Called from async dependencies, so cache access stays on the event loop instead of FastAPI's threadpool
+def decode_user_token(token: str, secret: str, cache: VerifiedClaimsCache) -> UserData | None:
+    # The cached instance is never handed out, so a handler mutating its copy cannot leak into other requests
+    user = cache.get(token)
+    if user is not None:
+        return user.model_copy()
+
+    payload = jwt.decode(token, secret, algorithms=[settings.JWT_ALGORITHM])
+    user = get_user_data_from_claims(payload)
+    if user is None:
+        return None
+
+    if "exp" in payload:
+        cache.set(token, user, payload["exp"])
+    return user.model_copy()
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token.credentials, settings.AUTH_JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        
-        required_fields = ["id", "email", "first_name", "last_name", "avatar", "country", "role", "tier", "verified", "blocked"]
-        if not all(field in payload for field in required_fields):
-            raise credentials_exception
-        
-        if not payload["verified"]:
-            raise HTTPException(
-                status_code=403,
-                detail="User account is not verified. Please verify your email to continue."
-            )
-        if payload["blocked"]:
-            raise HTTPException(
-                status_code=402,
-                detail="Email is blocked",
-            )
-            
-        return UserData(
-            email=payload["email"],
-            id=payload["id"],
-            first_name=payload["first_name"],
-            last_name=payload["last_name"],
-            avatar=payload["avatar"],
-            country=payload["country"],
-            role=UserRole(payload["role"]),
-            tier=UserTier(payload["tier"]),
-            verified=payload["verified"],
-            blocked=payload["blocked"]
-        )
+        user = decode_user_token(token.credentials, settings.AUTH_JWT_SECRET, auth_claims_cache)
     except (JWTError, ValueError) as e:
         raise credentials_exception
+    if user is None:
+        raise credentials_exception
 
-def get_verifying_user(token: str = Depends(oauth2_scheme)):
+    if not user.verified:
+        raise HTTPException(
+            status_code=403,
+            detail="User account is not verified. Please verify your email to continue."
+        )
+    if user.blocked:
+        raise HTTPException(
+            status_code=402,
+            detail="Email is blocked",
+        )
+
+    return user
+
+async def get_verifying_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token.credentials, settings.VERIFY_JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        
-        required_fields = ["id", "email", "first_name", "last_name", "avatar", "country", "role", "tier", "verified", "blocked"]
-        if not all(field in payload for field in required_fields):
-            raise credentials_exception
+        user = decode_user_token(token.credentials, settings.VERIFY_JWT_SECRET, verify_claims_cache)
+    except (JWTError, ValueError) as e:
+        raise credentials_exception
+    if user is None:
+        raise credentials_exception
 
-        if payload["blocked"]:
-            raise HTTPException(
-                status_code=402,
-                detail="Email is blocked",
-            )
-            
-        return UserData(
-            email=payload["email"],
-            id=payload["id"],
-            first_name=payload["first_name"],
-            last_name=payload["last_name"],
-            avatar=payload["avatar"],
-            country=payload["country"],
-            role=UserRole(payload["role"]),
-            tier=UserTier(payload["tier"]),
-            verified=payload["verified"],
-            blocked=payload["blocked"]
+    if user.blocked:
+        raise HTTPException(
+            status_code=402,
+            detail="Email is blocked",
         )
-    except (JWTError, ValueError) as e:
-        raise credentials_exception
\ No newline at end of file
+
+    return user
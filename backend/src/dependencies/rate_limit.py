@@ -0,0 +1,58 @@
+import math
+from fastapi import HTTPException, Request
+
+from src.config import settings
+from src.core import InMemoryRateLimitBackend, RateLimiter, RateLimited, password_hasher
+from src.db import PostgresRateLimitBackend
+from src.db.repositories import normalize_email
+
+# In-memory buckets are per worker, so with N workers a client effectively gets N times the configured limits
+rate_limit_backend = (
+    PostgresRateLimitBackend()
+    if settings.RATE_LIMIT_BACKEND == "postgres" else InMemoryRateLimitBackend(settings.RATE_LIMIT_CACHE_SIZE)
+)
+ip_limiter = RateLimiter(settings.RATE_LIMIT_IP_PER_MINUTE, settings.RATE_LIMIT_IP_BURST, rate_limit_backend)
+email_limiter = RateLimiter(settings.RATE_LIMIT_EMAIL_PER_MINUTE, settings.RATE_LIMIT_EMAIL_BURST, rate_limit_backend)
+
+def get_client_ip(request: Request) -> str | None:
+    # Only the entries appended by our own proxies can be trusted, anything further left is client-supplied
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if forwarded_for and settings.RATE_LIMIT_TRUSTED_PROXIES > 0:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(settings.RATE_LIMIT_TRUSTED_PROXIES, len(hops))]
+    return request.client.host if request.client else None
+
+def _too_many_requests(e: RateLimited) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many requests, please try again later",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+def limit_by_ip(scope: str):
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        try:
+            await ip_limiter.hit(f"{scope}:ip:{get_client_ip(request)}")
+        except RateLimited as e:
+            raise _too_many_requests(e)
+    return dependency
+
+async def limit_by_email(scope: str, email: str):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    try:
+        await email_limiter.hit(f"{scope}:email:{normalize_email(email)}")
+    except RateLimited as e:
+        raise _too_many_requests(e)
+
+def shed_hash_load():
+    # Refuse before querying or queueing anything once the bcrypt pool is already full; the body is already parsed by now
+    if password_hasher.saturated:
+        password_hasher.rejected += 1
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly", headers={"Retry-After": "1"})
+
+def get_rate_limit_stats() -> dict:
+    return {"ip": ip_limiter.stats(), "email": email_limiter.stats()}
@@ -1,6 +1,9 @@
 from .user import UserRole, UserTier
+from .email import EmailTemplate, EmailStatus
 
 __all__ = [
     "UserRole",
-    "UserTier"
-]
\ No newline at end of file
+    "UserTier",
+    "EmailTemplate",
+    "EmailStatus"
+]
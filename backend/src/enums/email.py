@@ -0,0 +1,11 @@
+from enum import Enum
+
+class EmailTemplate(str, Enum):
+    VERIFY_CREATE_ACCOUNT = "verify_create_account"
+    VERIFY_RESET_PASSWORD = "verify_reset_password"
+    CONTACT_CONFIRMATION = "contact_confirmation"
+
+class EmailStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
@@ -0,0 +1,9 @@
+from .admission import AdmissionControlMiddleware, AdmissionController, admission_controller
+from .metrics import MetricsMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "AdmissionController",
+    "admission_controller",
+    "MetricsMiddleware"
+]
@@ -0,0 +1,179 @@
+import asyncio
+import heapq
+import itertools
+import json
+import time
+
+from src.config import settings
+from src.core import Histogram
+
+class AdmissionRejected(Exception):
+    pass
+
+class AdmissionController:
+    """Concurrency limit adjusted AIMD-style from request latency, with a bounded priority queue in front of it."""
+
+    def __init__(
+        self,
+        min_limit: int = 8,
+        max_limit: int = 512,
+        initial_limit: int = 64,
+        target_latency: float = 1.0,
+        backoff: float = 0.9,
+        queue_size: int = 256,
+        queue_timeout: float = 5.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.queue_wait = Histogram()
+        self.latency = Histogram()
+        # (priority, sequence, future); lower priority values are admitted first
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._decreased_at = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    def _evict_lowest_priority(self, priority: int) -> bool:
+        """Make room for a more important request by rejecting the least important one waiting."""
+        waiting = [entry for entry in self._queue if not entry[2].done()]
+        if not waiting:
+            return False
+        worst = max(waiting)
+        if worst[0] <= priority:
+            return False
+        worst[2].set_exception(AdmissionRejected())
+        self.rejected_queue_full += 1
+        return True
+
+    async def acquire(self, priority: int):
+        if self.in_flight < int(self.limit) and not self._queue:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._queue) >= self.queue_size:
+            self._queue = [entry for entry in self._queue if not entry[2].done()]
+            heapq.heapify(self._queue)
+        if len(self._queue) >= self.queue_size and not self._evict_lowest_priority(priority):
+            self.rejected_queue_full += 1
+            raise AdmissionRejected()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        # The queue may only hold abandoned entries, in which case there is room right now
+        self._admit_waiting()
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # wait_for can time out after the slot was granted, which would otherwise leak it
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(None)
+            self.rejected_timeout += 1
+            raise AdmissionRejected()
+        except asyncio.CancelledError:
+            # Admitted just as the client went away, hand the slot to the next in line
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(None)
+            raise
+        finally:
+            self.queue_wait.observe(time.monotonic() - started)
+        self.admitted += 1
+
+    def release(self, latency: float | None):
+        self.in_flight -= 1
+        if latency is not None:
+            self.latency.observe(latency)
+            self._adjust(latency)
+        self._admit_waiting()
+
+    def _adjust(self, latency: float):
+        if latency <= self.target_latency:
+            # Additive increase: roughly one more slot per limit's worth of fast requests
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        elif time.monotonic() - self._decreased_at >= self.target_latency:
+            # Multiplicative decrease, at most once per target latency so one slow burst doesn't collapse the limit
+            self._decreased_at = time.monotonic()
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def _admit_waiting(self):
+        while self._queue and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_wait": self.queue_wait.snapshot(),
+            "latency": self.latency.snapshot()
+        }
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, controller: AdmissionController, priorities: dict[str, int] | None = None, default_priority: int = 1):
+        self.app = app
+        self.controller = controller
+        self.priorities = priorities or {}
+        self.default_priority = default_priority
+        self._rejection = json.dumps({"detail": "Server is overloaded, please try again shortly"}).encode("utf-8")
+
+    async def _reject(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(self._rejection)).encode("ascii")),
+                (b"retry-after", b"1")
+            ]
+        })
+        await send({"type": "http.response.body", "body": self._rejection})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.priorities.get(scope["path"], self.default_priority)
+        try:
+            await self.controller.acquire(priority)
+        except AdmissionRejected:
+            await self._reject(send)
+            return
+
+        started = time.monotonic()
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.monotonic() - started
+        finally:
+            # Failed requests free their slot without feeding the latency signal
+            self.controller.release(latency)
+
+admission_controller = AdmissionController(
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    target_latency=settings.ADMISSION_TARGET_LATENCY,
+    queue_size=settings.ADMISSION_QUEUE_SIZE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT
+)
@@ -0,0 +1,42 @@
+import time
+
+from src.core import registry
+
+request_seconds = registry.histogram("http_request_duration_seconds", "Request latency by route", ("method", "route"))
+responses = registry.counter("http_responses_total", "Responses by route and status code", ("method", "route", "status"))
+
+def route_template(scope) -> str:
+    """The matched route with its path parameters put back as placeholders, e.g. `/items/{item_id}`."""
+    if "route" not in scope:
+        return "unmatched"
+    # Newer FastAPI keeps included routes unprefixed and records the mounted template separately
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    if effective is not None:
+        return effective.path
+    return scope["route"].path
+
+class MetricsMiddleware:
+    """Records latency and status per route template, so path parameters don't explode label cardinality."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            request_seconds.labels(scope["method"], route).observe(time.perf_counter() - started)
+            responses.labels(scope["method"], route, str(status)).inc()
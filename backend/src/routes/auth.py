@@ -2,21 +2,19 @@ from fastapi import Request, APIRouter, Depends, HTTPException, Request
 
 from src.services import UserService, google_redirect, get_user_data_from_google_token, get_country_from_ip
 from src.schemas import UserLogin, UserData, UserBase, Token, UserPassword, UserCreate
-from src.dependencies import get_user_service, get_current_user, get_verifying_user
+from src.dependencies import get_user_service, get_current_user, get_verifying_user, get_client_ip, limit_by_ip, limit_by_email, shed_hash_load
 
 auth_router = APIRouter()
 
-@auth_router.post("/register")
+@auth_router.post("/register", dependencies=[Depends(shed_hash_load), Depends(limit_by_ip("register"))])
 async def register(
     user_data: UserCreate,
     request: Request,
     user_service: UserService = Depends(get_user_service)
 ):
     try:
-        ip = request.headers.get("X-Forwarded-For")
-        if ip:
-            ip = ip.split(",")[0].strip()
-        country = get_country_from_ip(ip)
+        await limit_by_email("register", user_data.email)
+        country = await get_country_from_ip(get_client_ip(request))
         await user_service.send_verification_link_for_create(user_data, country)
     except HTTPException:
         raise
@@ -26,12 +24,13 @@ async def register(
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
-@auth_router.post("/repwd/email")
+@auth_router.post("/repwd/email", dependencies=[Depends(limit_by_ip("repwd_email"))])
 async def send_reset_password_email(
     user_data: UserBase,
     user_service: UserService = Depends(get_user_service)
 ):
     try:
+        await limit_by_email("repwd_email", user_data.email)
         await user_service.send_verification_link_for_repwd(user_data)
     except HTTPException:
         raise
@@ -56,13 +55,14 @@ async def verify_email(
             detail=f"An unexpected error occurred: {str(e)}"
         )
     
-@auth_router.post("/repwd")
+@auth_router.post("/repwd", dependencies=[Depends(shed_hash_load), Depends(limit_by_ip("repwd"))])
 async def reset_password(
     password: UserPassword,
     user_service: UserService = Depends(get_user_service),
     user: UserData = Depends(get_verifying_user)
 ):
     try:
+        await limit_by_email("repwd", user.email)
         await user_service.reset_password(UserLogin(email=user.email, password=password.password))
     except HTTPException:
         raise
@@ -74,16 +74,26 @@ async def reset_password(
 
 @auth_router.get("/user")
 async def get_user(
-    user: UserData = Depends(get_current_user)
+    user: UserData = Depends(get_current_user),
+    user_service: UserService = Depends(get_user_service)
 ):
-    return user
+    try:
+        return await user_service.get_user_profile(user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
 
-@auth_router.post("/login", response_model=Token)
+@auth_router.post("/login", response_model=Token, dependencies=[Depends(shed_hash_load), Depends(limit_by_ip("login"))])
 async def login(
     user_data: UserLogin, 
     user_service: UserService = Depends(get_user_service)
 ):
     try:
+        await limit_by_email("login", user_data.email)
         return await user_service.login_user(user_data)
     except HTTPException:
         raise
@@ -107,16 +117,14 @@ async def get_google_redirect(
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
-@auth_router.get("/google", response_model=Token)
+# A first Google sign-in goes through create_user and hashes a password, so this is limited and shed like /register
+@auth_router.get("/google", response_model=Token, dependencies=[Depends(shed_hash_load), Depends(limit_by_ip("google"))])
 async def get_user_by_google(
     request: Request,
     user_service: UserService = Depends(get_user_service)
 ):
     try:
-        ip = request.headers.get("X-Forwarded-For")
-        if ip:
-            ip = ip.split(",")[0].strip()
-        country = get_country_from_ip(ip)
+        country = await get_country_from_ip(get_client_ip(request))
         user_data = await get_user_data_from_google_token(request)
         token = await user_service.get_token_by_email(
             UserCreate(
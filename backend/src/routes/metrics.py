@@ -0,0 +1,91 @@
+import hmac
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from src.config import settings
+from src.core import registry, password_hasher
+from src.db import get_pool_stats
+from src.db.session import telemetry
+from src.db.repositories import get_user_cache_stats
+from src.dependencies import get_rate_limit_stats
+from src.dependencies.jwt_service import auth_claims_cache, verify_claims_cache
+from src.middleware import admission_controller
+from src.services.oauth_service import google_oidc
+from src.services.stripe_service import get_stripe_stats
+from src.services.user_service import user_flights
+
+metrics_router = APIRouter()
+
+def collect_runtime_metrics():
+    """Expose the stats the subsystems already keep, read at scrape time."""
+    pool = get_pool_stats()
+    yield "db_pool_connections", "gauge", "Pooled database connections by state", [
+        ({"state": "checked_out"}, pool["checked_out"]),
+        ({"state": "checked_in"}, pool["checked_in"]),
+        ({"state": "overflow"}, pool["overflow"])
+    ]
+    yield "db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up waiting for a connection", [({}, pool["checkout_timeouts"])]
+    yield "db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pooled connection", [({}, telemetry.checkout_wait)]
+    yield "db_pool_connect_seconds", "histogram", "Time to open a new database connection", [({}, telemetry.connect_latency)]
+
+    yield "password_hash_in_flight", "gauge", "bcrypt operations running or queued", [({}, password_hasher.in_flight)]
+    yield "password_hash_rejected_total", "counter", "bcrypt operations refused because the pool was full", [({}, password_hasher.rejected)]
+
+    admission = admission_controller.stats()
+    yield "admission_limit", "gauge", "Current adaptive concurrency limit", [({}, admission["limit"])]
+    yield "admission_in_flight", "gauge", "Requests currently admitted", [({}, admission["in_flight"])]
+    yield "admission_queued", "gauge", "Requests waiting for admission", [({}, admission["queued"])]
+    yield "admission_rejected_total", "counter", "Requests refused by admission control", [
+        ({"reason": "queue_full"}, admission["rejected_queue_full"]),
+        ({"reason": "timeout"}, admission["rejected_timeout"])
+    ]
+    yield "admission_queue_wait_seconds", "histogram", "Time requests spent queued for admission", [({}, admission_controller.queue_wait)]
+
+    rate_limits = get_rate_limit_stats()
+    yield "rate_limit_decisions_total", "counter", "Rate limiter decisions by key kind", [
+        ({"kind": kind, "decision": decision}, count)
+        for kind, stats in rate_limits.items() for decision, count in stats.items()
+    ]
+
+    caches = {"jwt_auth": auth_claims_cache.stats(), "jwt_verify": verify_claims_cache.stats()}
+    stripe_stats = get_stripe_stats()
+    for kind, stats in stripe_stats["cache"].items():
+        caches[f"stripe_{kind}"] = stats
+    user_cache = get_user_cache_stats()
+    if user_cache is not None:
+        caches["user"] = {"size": user_cache["size"], "hits": user_cache["local_hits"] + user_cache["shared_hits"], "misses": user_cache["misses"]}
+    yield "cache_size", "gauge", "Entries held by in-process caches", [({"cache": name}, stats["size"]) for name, stats in caches.items()]
+    yield "cache_requests_total", "counter", "Cache lookups by result", [
+        ({"cache": name, "result": result}, stats[result]) for name, stats in caches.items() for result in ("hits", "misses")
+    ]
+
+    yield "singleflight_calls_total", "counter", "Coalesced calls by group and outcome", [
+        ({"group": "stripe", "outcome": "executed"}, stripe_stats["calls"] - stripe_stats["collapsed"]),
+        ({"group": "stripe", "outcome": "collapsed"}, stripe_stats["collapsed"]),
+        ({"group": "user_flows", "outcome": "executed"}, user_flights.calls - user_flights.collapsed),
+        ({"group": "user_flows", "outcome": "collapsed"}, user_flights.collapsed)
+    ]
+
+    oidc = google_oidc.stats()
+    yield "oidc_metadata_expires_in_seconds", "gauge", "Time until the cached Google OIDC metadata goes stale", [({}, oidc["expires_in"])]
+    yield "oidc_metadata_fetches_total", "counter", "Google OIDC discovery and JWKS fetches", [({}, oidc["fetches"])]
+
+registry.add_collector(collect_runtime_metrics)
+
+def require_metrics_access(request: Request):
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return
+    # A forwarded request reached a proxy first, so a loopback peer says nothing about the real client
+    elif request.client and request.client.host in ("127.0.0.1", "::1") and "x-forwarded-for" not in request.headers:
+        return
+    raise HTTPException(status_code=403, detail="Not authorized to read metrics")
+
+@metrics_router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def get_metrics():
+    if settings.METRICS_MULTIPROCESS_DIR:
+        body = registry.render_multiprocess(settings.METRICS_MULTIPROCESS_DIR)
+    else:
+        body = registry.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
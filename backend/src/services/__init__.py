@@ -1,12 +1,24 @@
 from .user_service import UserService
-from .oauth_service import google_redirect, get_user_data_from_google_token
+from .oauth_service import google_oidc, google_redirect, get_user_data_from_google_token, get_oauth
 from .ip_service import get_country_from_ip
 from .portfolio_agent_service import get_access_token_data
+from .smtp_service import smtp_pool
+from .email_dispatcher import email_dispatcher
+from .stripe_provisioner import stripe_provisioner
+from .jwt_service import get_user_data_from_claims
+from .stripe_service import get_stripe
 
 __all__ = [
     "UserService",
+    "google_oidc",
     "google_redirect",
     "get_user_data_from_google_token",
+    "get_oauth",
     "get_country_from_ip",
-    "get_access_token_data"
+    "get_access_token_data",
+    "smtp_pool",
+    "email_dispatcher",
+    "stripe_provisioner",
+    "get_user_data_from_claims",
+    "get_stripe"
 ]
\ No newline at end of file
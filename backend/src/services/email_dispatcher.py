@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.config import settings
+from src.core import Histogram
+from src.db import AsyncSessionLocal
+from src.db.models import EmailOutbox
+from src.db.repositories import EmailOutboxRepository
+from src.enums import EmailStatus
+from .smtp_service import send_templated_email
+
+logger = logging.getLogger(__name__)
+
+class EmailDispatcher:
+    """Drains the email outbox in batches, retrying failed sends with exponential backoff."""
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        concurrency: int = 8,
+        poll_interval: float = 1.0,
+        lease: float = 300,
+        max_attempts: int = 8,
+        retry_base: float = 5,
+        retry_max: float = 3600,
+        stats_interval: float = 60
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.stats_interval = stats_interval
+        self.send_latency = Histogram()
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.queue_depth: dict[EmailStatus, int] = {}
+        self._stopping = asyncio.Event()
+
+    def _get_retry_at(self, attempts: int) -> datetime | None:
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return datetime.now(timezone.utc) + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    async def _send(self, email: EmailOutbox, slots: asyncio.Semaphore) -> str | None:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await send_templated_email(email.template, email.recipient, email.context)
+                return None
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+            finally:
+                self.send_latency.observe(time.perf_counter() - started)
+
+    async def _renew_lease(self, ids: list[int], done: asyncio.Event):
+        # A batch can outlast one lease (every send hitting the SMTP timeout), so keep it claimed until it finishes
+        interval = self.lease.total_seconds() / 3
+        while True:
+            try:
+                await asyncio.wait_for(done.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                async with AsyncSessionLocal() as db:
+                    await EmailOutboxRepository(db).renew_lease(ids, self.lease)
+            except Exception as e:
+                logger.warning("Could not renew the lease on %d emails: %s", len(ids), e)
+
+    async def dispatch_batch(self) -> int:
+        async with AsyncSessionLocal() as db:
+            repository = EmailOutboxRepository(db)
+            emails = await repository.claim_batch(self.batch_size, self.lease)
+            if not emails:
+                return 0
+
+            done = asyncio.Event()
+            renewal = asyncio.create_task(self._renew_lease([email.id for email in emails], done))
+            slots = asyncio.Semaphore(self.concurrency)
+            try:
+                errors = await asyncio.gather(*(self._send(email, slots) for email in emails))
+            finally:
+                # Let a renewal in flight finish rather than cancel it mid-statement
+                done.set()
+                await renewal
+
+            sent, failed = [], []
+            for email, error in zip(emails, errors):
+                if error is None:
+                    sent.append(email)
+                    continue
+                retry_at = self._get_retry_at(email.attempts)
+                failed.append((email, error, retry_at))
+                if retry_at is None:
+                    self.dead_lettered += 1
+                    logger.error("Dead-lettered email %s to %s after %d attempts: %s", email.id, email.recipient, email.attempts, error)
+                else:
+                    self.retried += 1
+                    logger.warning("Email %s to %s failed (attempt %d), retrying: %s", email.id, email.recipient, email.attempts, error)
+
+            await repository.complete_batch(sent, failed)
+            self.sent += len(sent)
+            return len(emails)
+
+    async def refresh_queue_depth(self):
+        async with AsyncSessionLocal() as db:
+            self.queue_depth = await EmailOutboxRepository(db).count_by_status()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.queue_depth.get(EmailStatus.PENDING, 0),
+            "dead": self.queue_depth.get(EmailStatus.DEAD, 0),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "send_latency": self.send_latency.snapshot()
+        }
+
+    async def run(self):
+        self._stopping.clear()
+        stats_at = 0.0
+        while not self._stopping.is_set():
+            try:
+                dispatched = await self.dispatch_batch()
+                if time.monotonic() - stats_at >= self.stats_interval:
+                    stats_at = time.monotonic()
+                    await self.refresh_queue_depth()
+                    stats = self.stats()
+                    logger.info(
+                        "Email outbox: %d pending, %d dead, %d sent, send p50 %ss p99 %ss",
+                        stats["pending"], stats["dead"], stats["sent"],
+                        stats["send_latency"]["p50"], stats["send_latency"]["p99"]
+                    )
+            except Exception:
+                logger.exception("Email dispatch failed")
+                dispatched = 0
+
+            # A full batch means more mail is probably due, so only sleep once the queue is drained
+            if dispatched < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stopping.set()
+
+email_dispatcher = EmailDispatcher(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    concurrency=settings.EMAIL_OUTBOX_CONCURRENCY,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+    lease=settings.EMAIL_OUTBOX_LEASE,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_OUTBOX_RETRY_BASE,
+    retry_max=settings.EMAIL_OUTBOX_RETRY_MAX
+)
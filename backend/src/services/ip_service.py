@@ -1,8 +1,53 @@
-import requests
+import ipaddress
+import logging
+from cachetools import TTLCache
 
-def get_country_from_ip(ip: str):
+from src.config import settings
+from src.core import GeoIPDatabase, track_external_call
+
+logger = logging.getLogger(__name__)
+
+geoip_database = GeoIPDatabase(settings.GEOIP_DATABASE_PATH, settings.GEOIP_RELOAD_INTERVAL)
+country_cache: TTLCache = TTLCache(maxsize=settings.GEOIP_CACHE_SIZE, ttl=settings.GEOIP_CACHE_TTL)
+_http_client = None
+
+@track_external_call("geoip", "http_lookup")
+async def _get_country_over_http(ip: str) -> str | None:
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.AsyncClient(timeout=settings.GEOIP_HTTP_TIMEOUT)
+    res = await _http_client.get(settings.GEOIP_HTTP_URL.format(ip=ip))
+    res.raise_for_status()
+    return res.json().get("country")
+
+@track_external_call("geoip", "lookup")
+def _lookup_country(address: ipaddress.IPv4Address | ipaddress.IPv6Address) -> str | None:
+    return geoip_database.lookup(address)
+
+async def get_country_from_ip(ip: str | None) -> str:
+    # users.country is NOT NULL, so every failure path still resolves to a placeholder
+    if not ip:
+        return settings.GEOIP_DEFAULT_COUNTRY
     try:
-        res = requests.get(f"http://ip-api.com/json/{ip}?fields=country")
-        return res.json().get("country")
-    except Exception:
-        return None
\ No newline at end of file
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return settings.GEOIP_DEFAULT_COUNTRY
+
+    key = str(address)
+    if key in country_cache:
+        return country_cache[key]
+
+    country = _lookup_country(address)
+    if country is None and (settings.GEOIP_HTTP_FALLBACK or not geoip_database.loaded):
+        try:
+            country = await _get_country_over_http(key)
+        except Exception as e:
+            # Transient failures are not cached so the next request retries
+            logger.warning("GeoIP HTTP lookup failed for %s: %s", key, e)
+            return settings.GEOIP_DEFAULT_COUNTRY
+
+    country = country or settings.GEOIP_DEFAULT_COUNTRY
+    country_cache[key] = country
+    return country
@@ -1,19 +1,80 @@
-from datetime import timedelta, datetime
+import time
+from datetime import timedelta
 from jose import jwt
 
 from src.config import settings
-from src.schemas import Token
+from src.schemas import Token, UserData
+from src.db.models import User
+from src.enums import UserRole, UserTier
+
+# Version 2 claims use one-letter keys, integer codes for enums and a flag bitmask,
+# and leave the avatar URL out. Tokens without "v" are the original verbose format.
+CLAIMS_VERSION = 2
+ROLE_CODES = {UserRole.USER: 0, UserRole.ADMIN: 1}
+TIER_CODES = {UserTier.FREE: 0, UserTier.PRO: 1, UserTier.PRO_PLUS: 2}
+ROLES_BY_CODE = {code: role for role, code in ROLE_CODES.items()}
+TIERS_BY_CODE = {code: tier for tier, code in TIER_CODES.items()}
+FLAG_VERIFIED = 1
+FLAG_BLOCKED = 2
+
+LEGACY_FIELDS = ("id", "email", "first_name", "last_name", "avatar", "country", "role", "tier", "verified", "blocked")
+COMPACT_FIELDS = ("i", "e", "f", "l", "c", "r", "t", "s")
+
+def get_user_claims(user: User, country: str | None = None) -> dict:
+    return {
+        "v": CLAIMS_VERSION,
+        "i": user.id,
+        "e": user.email,
+        "f": user.first_name,
+        "l": user.last_name,
+        "c": country if country is not None else user.country,
+        "r": ROLE_CODES[user.role],
+        "t": TIER_CODES[user.tier],
+        "s": (FLAG_VERIFIED if user.verified else 0) | (FLAG_BLOCKED if user.blocked else 0)
+    }
+
+def get_user_data_from_claims(payload: dict) -> UserData | None:
+    version = payload.get("v", 1)
+    if version == CLAIMS_VERSION:
+        if not all(field in payload for field in COMPACT_FIELDS):
+            return None
+        return UserData(
+            email=payload["e"],
+            id=payload["i"],
+            first_name=payload["f"],
+            last_name=payload["l"],
+            avatar=None,
+            country=payload["c"],
+            role=ROLES_BY_CODE.get(payload["r"]),
+            tier=TIERS_BY_CODE.get(payload["t"]),
+            verified=bool(payload["s"] & FLAG_VERIFIED),
+            blocked=bool(payload["s"] & FLAG_BLOCKED)
+        )
+    if version == 1:
+        if not all(field in payload for field in LEGACY_FIELDS):
+            return None
+        return UserData(
+            email=payload["email"],
+            id=payload["id"],
+            first_name=payload["first_name"],
+            last_name=payload["last_name"],
+            avatar=payload["avatar"],
+            country=payload["country"],
+            role=UserRole(payload["role"]),
+            tier=UserTier(payload["tier"]),
+            verified=payload["verified"],
+            blocked=payload["blocked"]
+        )
+    return None
 
 def create_verify_token(data: dict, expires_delta: timedelta = timedelta(minutes=settings.VERIFY_TOKEN_EXPIRE_TIMEOUT)):
     to_encode = data.copy()
-    expire = datetime.now() + expires_delta
-    to_encode.update({"exp": expire})
+    to_encode["exp"] = int(time.time() + expires_delta.total_seconds())
     encoded_jwt = jwt.encode(to_encode, settings.VERIFY_JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return Token(token=encoded_jwt)
     
 def create_auth_token(data: dict, expires_delta: timedelta = timedelta(minutes=settings.AUTH_TOKEN_EXPIRE_TIMEOUT)):
     to_encode = data.copy()
-    expire = datetime.now() + expires_delta
-    to_encode.update({"exp": expire})
+    to_encode["exp"] = int(time.time() + expires_delta.total_seconds())
     encoded_jwt = jwt.encode(to_encode, settings.AUTH_JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
-    return Token(token=encoded_jwt)
\ No newline at end of file
+    return Token(token=encoded_jwt)
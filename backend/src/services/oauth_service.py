@@ -1,32 +1,65 @@
+import functools
 from fastapi import Request, HTTPException
-from authlib.integrations.starlette_client import OAuth, OAuthError
 from starlette.config import Config
 
 from src.config import settings
+from src.core import track_external_call, OIDCProviderCache
 
 config_data = {
     'GOOGLE_CLIENT_ID': settings.GOOGLE_CLIENT_ID,
     'GOOGLE_CLIENT_SECRET': settings.GOOGLE_CLIENT_SECRET
 }
 starlette_config = Config(environ=config_data)
-oauth = OAuth(starlette_config)
-oauth.register(
-    name='google',
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={'scope': 'openid email profile'},
+
+google_oidc = OIDCProviderCache(
+    issuer=settings.GOOGLE_OIDC_ISSUER,
+    cache_path=settings.GOOGLE_OIDC_CACHE_PATH,
+    default_ttl=settings.GOOGLE_OIDC_DEFAULT_TTL,
+    refresh_margin=settings.GOOGLE_OIDC_REFRESH_MARGIN
 )
 
+@functools.cache
+def get_oauth():
+    # authlib and the httpx client under it stay out of the app import; the API server loads them before serving
+    from authlib.integrations.starlette_client import OAuth
+
+    oauth = OAuth(starlette_config)
+    # No server_metadata_url: discovery and keys come from google_oidc, so id tokens are verified offline
+    oauth.register(
+        name='google',
+        client_kwargs={'scope': 'openid email profile'},
+    )
+    return oauth
+
+_synced_version = 0
+
+async def get_google_client():
+    global _synced_version
+
+    metadata, jwks = await google_oidc.ensure()
+    client = get_oauth().google
+    if _synced_version != google_oidc.version:
+        client.server_metadata.update(metadata, jwks=jwks)
+        _synced_version = google_oidc.version
+    return client
+
+@track_external_call("google_oauth", "authorize_redirect")
 async def google_redirect(request: Request):
     redirect_uri = settings.GOOGLE_REDIRECT_URI
-    return await oauth.google.authorize_redirect(request, redirect_uri)
+    client = await get_google_client()
+    return await client.authorize_redirect(request, redirect_uri)
 
+@track_external_call("google_oauth", "authorize_access_token")
 async def get_user_data_from_google_token(request: Request):
+    from authlib.integrations.starlette_client import OAuthError
+
+    client = await get_google_client()
     try:
-        access_token = await oauth.google.authorize_access_token(request)
+        access_token = await client.authorize_access_token(request)
     except OAuthError:
         raise HTTPException(
             status_code=401,
             detail="Your google token is not correct"
         )
     
-    return access_token["userinfo"]
\ No newline at end of file
+    return access_token["userinfo"]
@@ -1,10 +1,14 @@
-from livekit import api
 import uuid
 
 from src.config import settings
+from src.core import track_external_call
 from src.schemas import PortfolioAgentTokenData
 
+@track_external_call("livekit", "sign_token")
 def get_access_token_data(identity: str, room: str = "portfolio-agent") -> PortfolioAgentTokenData:
+    # Kept out of the app import; the API server imports it before serving (see load_sdks)
+    from livekit import api
+
     at = api.AccessToken(settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET)
     at.with_grants(api.VideoGrants(room_join=True, room=f"{room}-{uuid.uuid4()}"))
     at.with_identity(identity)
@@ -1,4 +1,3 @@
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -6,9 +5,22 @@ from email import encoders
 import os
 
 from src.config import settings
-
-def get_verify_email_for_create_account_html(url, name):
-    return f"""<!doctype html>
+from src.core import SMTPPool, Template, MimeTemplate
+from src.enums import EmailTemplate
+
+smtp_pool = SMTPPool(
+    host=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_EMAIL_ADDRESS,
+    password=settings.SMTP_PASSWORD,
+    size=settings.SMTP_POOL_SIZE,
+    use_tls=settings.SMTP_USE_TLS,
+    start_tls=settings.SMTP_START_TLS,
+    timeout=settings.SMTP_TIMEOUT,
+    keepalive_interval=settings.SMTP_KEEPALIVE_INTERVAL
+)
+
+VERIFY_CREATE_ACCOUNT_HTML = Template("""<!doctype html>
 <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
   <head>
     <title>Email Verification</title>
@@ -65,10 +77,10 @@ def get_verify_email_for_create_account_html(url, name):
                 
                 <div class="divider"></div>
                 
-                <p class="body" style="margin:0 0 20px 0;">Hello, {name}.</p>
+                <p class="body" style="margin:0 0 20px 0;">Hello, {first_name} {last_name}.</p>
                 <p class="body" style="margin:0 0 20px 0;">Thank you for joining <strong>{settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio</strong>. To activate your account and confirm your email address, please click the button below:</p>
                 
-                <a class="btn" href="{url}" target="_blank">Verify Email</a>
+                <a class="btn" href="{verification_url}" target="_blank">Verify Email</a>
                 
                 <div class="divider"></div>
                 
@@ -92,10 +104,9 @@ def get_verify_email_for_create_account_html(url, name):
       </tr>
     </table>
   </body>
-</html>"""
+</html>""", {"settings": settings})
 
-def get_verify_email_for_reset_password_html(url, name):
-    return f"""<!doctype html>
+VERIFY_RESET_PASSWORD_HTML = Template("""<!doctype html>
 <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
   <head>
     <title>Password Reset Verification</title>
@@ -152,10 +163,10 @@ def get_verify_email_for_reset_password_html(url, name):
                 
                 <div class="divider"></div>
                 
-                <p class="body" style="margin:0 0 20px 0;">Hello, {name}.</p>
+                <p class="body" style="margin:0 0 20px 0;">Hello, {first_name} {last_name}.</p>
                 <p class="body" style="margin:0 0 20px 0;">I received a request to reset the password for your account at <strong>{settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio</strong>. If this was you, please confirm the request by clicking the button below:</p>
                 
-                <a class="btn" href="{url}" target="_blank">Reset Password</a>
+                <a class="btn" href="{verification_url}" target="_blank">Reset Password</a>
                 
                 <div class="divider"></div>
                 
@@ -179,10 +190,9 @@ def get_verify_email_for_reset_password_html(url, name):
       </tr>
     </table>
   </body>
-</html>"""
+</html>""", {"settings": settings})
 
-def get_reply_contact_html(name: str):
-    return f"""<!doctype html>
+CONTACT_CONFIRMATION_HTML = Template("""<!doctype html>
 <html lang="en" xmlns="http://www.w3.org/1999/xhtml">
   <head>
     <title>Contact Confirmation</title>
@@ -222,7 +232,7 @@ def get_reply_contact_html(name: str):
               <td class="px py card">
                 <img src="https://i.ibb.co/zHTsJZyF/photo-2025-08-05-07-52-15.jpg" alt="{settings.FIRST_NAME} {settings.LAST_NAME}" class="avatar">
                 <h1 class="title">{settings.FIRST_NAME} {settings.LAST_NAME}</h1>
-                <p class="body" style="margin:0 0 20px 0;">Hello, {name}.</p>
+                <p class="body" style="margin:0 0 20px 0;">Hello, {first_name} {last_name}.</p>
                 
                 <div class="divider"></div>
 
@@ -242,43 +252,9 @@ def get_reply_contact_html(name: str):
       </tr>
     </table>
   </body>
-</html>"""
-
-def send_email_with_attachment(recipient_email, subject, body, html_body=None, attachment_path=None):
-    message = MIMEMultipart('alternative')
-    message['From'] = settings.SMTP_EMAIL_ADDRESS
-    message['To'] = recipient_email
-    message['Subject'] = subject
-    
-    part1 = MIMEText(body, 'plain')
-    message.attach(part1)
-    
-    if html_body:
-        part2 = MIMEText(html_body, 'html')
-        message.attach(part2)
-    
-    if attachment_path and os.path.exists(attachment_path):
-        with open(attachment_path, "rb") as attachment:
-            part = MIMEBase('application', 'octet-stream')
-            part.set_payload(attachment.read())
-        encoders.encode_base64(part)
-        part.add_header(
-            'Content-Disposition',
-            f'attachment; filename= {os.path.basename(attachment_path)}',
-        )
-        message.attach(part)
-    
-    with smtplib.SMTP('smtp.gmail.com', 587) as server:
-        server.starttls()
-        server.login(settings.SMTP_EMAIL_ADDRESS, settings.SMTP_PASSWORD)
-        server.send_message(message)
+</html>""", {"settings": settings})
 
-def send_verification_email_for_create_account(recipient_email: str, first_name: str, last_name: str, verification_url: str):
-    subject = f"Verify your email for {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio"
-    
-    html_content = get_verify_email_for_create_account_html(verification_url, f"{first_name} {last_name}")
-    
-    text_content = f"""
+VERIFY_CREATE_ACCOUNT_TEXT = Template("""
     Welcome to {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio
 
     Hello, {first_name} {last_name}.
@@ -289,21 +265,9 @@ def send_verification_email_for_create_account(recipient_email: str, first_name:
     This link will expire in 15 minutes.
     
     If you didn't request this, please ignore this email.
-    """
-    
-    send_email_with_attachment(
-        recipient_email=recipient_email,
-        subject=subject,
-        body=text_content,
-        html_body=html_content
-    )
+    """, {"settings": settings})
 
-def send_verification_email_for_reset_password(recipient_email: str, first_name: str, last_name: str, verification_url: str):
-    subject = f"Password Reset Verification for {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio"
-    
-    html_content = get_verify_email_for_reset_password_html(verification_url, f"{first_name} {last_name}")
-    
-    text_content = f"""
+VERIFY_RESET_PASSWORD_TEXT = Template("""
     Password Reset Request
 
     Hello, {first_name} {last_name}.
@@ -318,21 +282,9 @@ def send_verification_email_for_reset_password(recipient_email: str, first_name:
     - Never share this link with anyone
     - Create a strong, unique password
     - Update your password regularly
-    """
-    
-    send_email_with_attachment(
-        recipient_email=recipient_email,
-        subject=subject,
-        body=text_content,
-        html_body=html_content
-    )
-
-def send_contact_confirmation_email(recipient_email: str, first_name: str, last_name: str):
-    subject = f"Thanks for contacting {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio"
+    """, {"settings": settings})
 
-    html_content = get_reply_contact_html(f"{first_name} {last_name}")
-
-    text_content = f"""
+CONTACT_CONFIRMATION_TEXT = Template("""
     Hello, {first_name} {last_name}.
 
     Thank you for contacting me through my portfolio site. I've received your message and will get back to you as soon as possible.
@@ -342,11 +294,86 @@ def send_contact_confirmation_email(recipient_email: str, first_name: str, last_
 
     Best regards,
     {settings.FIRST_NAME} {settings.LAST_NAME}
-    """
-
-    send_email_with_attachment(
-        recipient_email=recipient_email,
-        subject=subject,
-        body=text_content,
-        html_body=html_content
-    )
\ No newline at end of file
+    """, {"settings": settings})
+
+verify_create_account_email = MimeTemplate(
+    sender=settings.SMTP_EMAIL_ADDRESS,
+    subject=f"Verify your email for {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio",
+    text=VERIFY_CREATE_ACCOUNT_TEXT,
+    html=VERIFY_CREATE_ACCOUNT_HTML
+)
+
+verify_reset_password_email = MimeTemplate(
+    sender=settings.SMTP_EMAIL_ADDRESS,
+    subject=f"Password Reset Verification for {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio",
+    text=VERIFY_RESET_PASSWORD_TEXT,
+    html=VERIFY_RESET_PASSWORD_HTML
+)
+
+contact_confirmation_email = MimeTemplate(
+    sender=settings.SMTP_EMAIL_ADDRESS,
+    subject=f"Thanks for contacting {settings.FIRST_NAME} {settings.LAST_NAME}'s Portfolio",
+    text=CONTACT_CONFIRMATION_TEXT,
+    html=CONTACT_CONFIRMATION_HTML
+)
+
+async def send_email_with_attachment(recipient_email, subject, body, html_body=None, attachment_path=None):
+    message = MIMEMultipart('alternative')
+    message['From'] = settings.SMTP_EMAIL_ADDRESS
+    message['To'] = recipient_email
+    message['Subject'] = subject
+    
+    part1 = MIMEText(body, 'plain')
+    message.attach(part1)
+    
+    if html_body:
+        part2 = MIMEText(html_body, 'html')
+        message.attach(part2)
+    
+    if attachment_path and os.path.exists(attachment_path):
+        with open(attachment_path, "rb") as attachment:
+            part = MIMEBase('application', 'octet-stream')
+            part.set_payload(attachment.read())
+        encoders.encode_base64(part)
+        part.add_header(
+            'Content-Disposition',
+            f'attachment; filename= {os.path.basename(attachment_path)}',
+        )
+        message.attach(part)
+    
+    await smtp_pool.send_message(message)
+
+async def send_verification_email_for_create_account(recipient_email: str, first_name: str, last_name: str, verification_url: str):
+    message = verify_create_account_email.build(
+        recipient_email,
+        first_name=first_name,
+        last_name=last_name,
+        verification_url=verification_url
+    )
+    await smtp_pool.sendmail(settings.SMTP_EMAIL_ADDRESS, [recipient_email], message)
+
+async def send_verification_email_for_reset_password(recipient_email: str, first_name: str, last_name: str, verification_url: str):
+    message = verify_reset_password_email.build(
+        recipient_email,
+        first_name=first_name,
+        last_name=last_name,
+        verification_url=verification_url
+    )
+    await smtp_pool.sendmail(settings.SMTP_EMAIL_ADDRESS, [recipient_email], message)
+
+async def send_contact_confirmation_email(recipient_email: str, first_name: str, last_name: str):
+    message = contact_confirmation_email.build(
+        recipient_email,
+        first_name=first_name,
+        last_name=last_name
+    )
+    await smtp_pool.sendmail(settings.SMTP_EMAIL_ADDRESS, [recipient_email], message)
+
+EMAIL_SENDERS = {
+    EmailTemplate.VERIFY_CREATE_ACCOUNT: send_verification_email_for_create_account,
+    EmailTemplate.VERIFY_RESET_PASSWORD: send_verification_email_for_reset_password,
+    EmailTemplate.CONTACT_CONFIRMATION: send_contact_confirmation_email
+}
+
+async def send_templated_email(template: EmailTemplate, recipient_email: str, context: dict):
+    await EMAIL_SENDERS[template](recipient_email, **context)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.config import settings
+from src.core import Histogram
+from src.db import AsyncSessionLocal
+from src.db.models import User
+from src.db.repositories import UserRepository
+from .stripe_service import get_stripe_customer_id
+
+logger = logging.getLogger(__name__)
+
+class StripeCustomerProvisioner:
+    """Attaches Stripe customers to users registered without one, in batches with per-user backoff."""
+
+    def __init__(
+        self,
+        batch_size: int = 20,
+        concurrency: int = 4,
+        lease: float = 900,
+        poll_interval: float = 2.0,
+        retry_base: float = 5,
+        retry_max: float = 600,
+        stats_interval: float = 60
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.stats_interval = stats_interval
+        self.request_latency = Histogram()
+        self.provisioned = 0
+        self.failed = 0
+        # user id -> (consecutive failures, monotonic time of the next attempt)
+        self._backoff: dict[int, tuple[int, float]] = {}
+        self._stopping = asyncio.Event()
+
+    def _schedule_retry(self, user_id: int) -> float:
+        failures = self._backoff.get(user_id, (0, 0.0))[0] + 1
+        delay = min(self.retry_max, self.retry_base * 2 ** (failures - 1)) * random.uniform(0.8, 1.2)
+        self._backoff[user_id] = (failures, time.monotonic() + delay)
+        return delay
+
+    async def _provision(self, user: User, slots: asyncio.Semaphore) -> str:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                return await get_stripe_customer_id(user.email)
+            finally:
+                self.request_latency.observe(time.perf_counter() - started)
+
+    async def provision_batch(self) -> int:
+        now = time.monotonic()
+        waiting = [user_id for user_id, (_, retry_at) in self._backoff.items() if retry_at > now]
+        async with AsyncSessionLocal() as db:
+            repository = UserRepository(db)
+            users = await repository.claim_pending_stripe_customers(self.batch_size, self.lease, waiting)
+            if not users:
+                return 0
+
+            # The claim is committed, so no transaction or row lock is held while Stripe is called
+            slots = asyncio.Semaphore(self.concurrency)
+            results = await asyncio.gather(*(self._provision(user, slots) for user in users), return_exceptions=True)
+
+            provisioned = 0
+            for user, result in zip(users, results):
+                if isinstance(result, Exception):
+                    self.failed += 1
+                    delay = self._schedule_retry(user.id)
+                    # Keeping the lease until the retry is due backs off every provisioner, not just this one
+                    user.stripe_claimed_until = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                    logger.warning("Stripe customer for user %s failed, retrying in %.0fs: %s", user.id, delay, result)
+                    continue
+                user.stripe_customer_id = result
+                user.stripe_claimed_until = None
+                self._backoff.pop(user.id, None)
+                provisioned += 1
+
+            await repository.save_users(users)
+            self.provisioned += provisioned
+            return len(users)
+
+    def stats(self) -> dict:
+        return {
+            "provisioned": self.provisioned,
+            "failed": self.failed,
+            "backing_off": len(self._backoff),
+            "request_latency": self.request_latency.snapshot()
+        }
+
+    async def run(self):
+        self._stopping.clear()
+        stats_at = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.provision_batch()
+                if time.monotonic() - stats_at >= self.stats_interval:
+                    stats_at = time.monotonic()
+                    stats = self.stats()
+                    logger.info(
+                        "Stripe provisioning: %d provisioned, %d failed, %d backing off, request p50 %ss p99 %ss",
+                        stats["provisioned"], stats["failed"], stats["backing_off"],
+                        stats["request_latency"]["p50"], stats["request_latency"]["p99"]
+                    )
+            except Exception:
+                logger.exception("Stripe provisioning failed")
+                claimed = 0
+
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stopping.set()
+
+stripe_provisioner = StripeCustomerProvisioner(
+    batch_size=settings.STRIPE_PROVISION_BATCH_SIZE,
+    concurrency=settings.STRIPE_PROVISION_CONCURRENCY,
+    lease=settings.STRIPE_PROVISION_LEASE,
+    poll_interval=settings.STRIPE_PROVISION_POLL_INTERVAL,
+    retry_base=settings.STRIPE_PROVISION_RETRY_BASE,
+    retry_max=settings.STRIPE_PROVISION_RETRY_MAX
+)
@@ -1,25 +1,79 @@
-import stripe
+import functools
+import hashlib
+from cachetools import TTLCache
 
 from src.config import settings
+from src.core import SingleFlight, track_external_call
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+@functools.cache
+def get_stripe():
+    """Import and configure the Stripe SDK, one of the slowest imports; the API server does this before serving."""
+    import stripe
 
-async def get_stripe_customer_id(email: str) -> str:
-    customers = await stripe.Customer.list_async(email=email, limit=1)
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    if settings.STRIPE_API_BASE:
+        # e.g. a local stripe-mock instance for development and load tests
+        stripe.api_base = settings.STRIPE_API_BASE
+    return stripe
+
+stripe_requests = SingleFlight()
+customer_id_cache = TTLCache(maxsize=settings.STRIPE_CACHE_SIZE, ttl=settings.STRIPE_CUSTOMER_CACHE_TTL)
+payment_method_cache = TTLCache(maxsize=settings.STRIPE_CACHE_SIZE, ttl=settings.STRIPE_PAYMENT_METHOD_CACHE_TTL)
+cache_hits = {"customer_id": 0, "payment_method": 0}
+cache_misses = {"customer_id": 0, "payment_method": 0}
+
+@track_external_call("stripe", "resolve_customer")
+async def _fetch_stripe_customer_id(email: str) -> str:
+    customers = await get_stripe().Customer.list_async(email=email, limit=1)
     if customers.data:
-        return customers.data[0].id
+        customer_id = customers.data[0].id
     else:
-        customer = await stripe.Customer.create_async(email=email)
-        return customer.id
+        # Keyed by email so a create retried by another process returns the same customer
+        idempotency_key = "customer-create-" + hashlib.sha256(email.encode("utf-8")).hexdigest()
+        customer = await get_stripe().Customer.create_async(email=email, idempotency_key=idempotency_key)
+        customer_id = customer.id
+    customer_id_cache[email] = customer_id
+    return customer_id
+
+async def get_stripe_customer_id(email: str) -> str:
+    customer_id = customer_id_cache.get(email)
+    if customer_id is not None:
+        cache_hits["customer_id"] += 1
+        return customer_id
+    cache_misses["customer_id"] += 1
+    return await stripe_requests.do(("customer_id", email), _fetch_stripe_customer_id, email)
 
+@track_external_call("stripe", "create_setup_intent")
 async def get_stripe_client_secret(stripe_customer_id: str) -> str:
-    setup_intent = await stripe.SetupIntent.create_async(
+    setup_intent = await get_stripe().SetupIntent.create_async(
         customer=stripe_customer_id,
         payment_method_types=['card'],
         usage='on_session'
     )
     return setup_intent.client_secret
 
+@track_external_call("stripe", "retrieve_payment_method")
+async def _fetch_stripe_payment_method(payment_method_id: str):
+    payment_method = await get_stripe().PaymentMethod.retrieve_async(payment_method_id)
+    payment_method_cache[payment_method_id] = payment_method
+    return payment_method
+
 async def get_stripe_payment_method(payment_method_id: str):
-    payment_method = await stripe.PaymentMethod.retrieve_async(payment_method_id)
-    return payment_method
\ No newline at end of file
+    payment_method = payment_method_cache.get(payment_method_id)
+    if payment_method is not None:
+        cache_hits["payment_method"] += 1
+        return payment_method
+    cache_misses["payment_method"] += 1
+    return await stripe_requests.do(("payment_method", payment_method_id), _fetch_stripe_payment_method, payment_method_id)
+
+def invalidate_stripe_payment_method(payment_method_id: str):
+    payment_method_cache.pop(payment_method_id, None)
+
+def get_stripe_stats() -> dict:
+    return {
+        **stripe_requests.stats(),
+        "cache": {
+            kind: {"size": len(cache), "hits": cache_hits[kind], "misses": cache_misses[kind]}
+            for kind, cache in (("customer_id", customer_id_cache), ("payment_method", payment_method_cache))
+        }
+    }
@@ -1,19 +1,68 @@
+import asyncio
+import functools
+import hashlib
+import time
+from cachetools import TTLCache
 from fastapi import HTTPException
-from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas import UserCreate, UserData, UserBase, UserLogin, Token
-from src.db.repositories import UserRepository
+from src.db import advisory_xact_lock
+from src.db.repositories import UserRepository, EmailOutboxRepository, normalize_email
 from src.db.models import User
-from src.core import get_password_hash, verify_password
+from src.core import get_password_hash_async, verify_password_async, PasswordHasherBusy, SingleFlight, KeyedLocks
 from src.config import settings
-from .jwt_service import create_auth_token, create_verify_token
+from src.enums import EmailTemplate
+from .jwt_service import create_auth_token, create_verify_token, get_user_claims
 from .stripe_service import get_stripe_customer_id
-from .smtp_service import send_verification_email_for_create_account, send_verification_email_for_reset_password
+
+user_flights = SingleFlight()
+user_locks = KeyedLocks()
+# user id -> avatar URL or None; filled wherever the user row is already at hand
+avatar_cache = TTLCache(maxsize=settings.AVATAR_CACHE_SIZE, ttl=settings.AVATAR_CACHE_TTL)
+
+def _single_flight(method):
+    """Collapse concurrent identical calls onto one run and serialise it with other mutations of the same email.
+
+    The run uses the session of the call that started it. With USER_FLOW_SHARED_LOCK it also takes a
+    transaction-level advisory lock on that same connection, so a flow never holds a second pooled connection.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, user_data: UserBase, *args, **kwargs):
+        email = normalize_email(user_data.email)
+        payload = [value.model_dump_json() if isinstance(value, BaseModel) else repr(value) for value in (user_data, *args)]
+        payload.extend(f"{name}={value!r}" for name, value in sorted(kwargs.items()))
+        key = (method.__name__, email, hashlib.sha256("\0".join(payload).encode("utf-8")).hexdigest())
+
+        async def run():
+            async with user_locks.hold(email):
+                if settings.USER_FLOW_SHARED_LOCK:
+                    try:
+                        await advisory_xact_lock(self.repository.db, f"user:{email}", settings.USER_FLOW_LOCK_TIMEOUT)
+                    except TimeoutError:
+                        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly", headers={"Retry-After": "1"})
+                return await method(self, user_data, *args, **kwargs)
+
+        return await user_flights.do(key, run)
+    return wrapper
 
 class UserService:
     def __init__(self, db: AsyncSession):
         self.repository = UserRepository(db)
+        self.outbox = EmailOutboxRepository(db)
+
+    async def _hash_password(self, password: str) -> str:
+        try:
+            return await get_password_hash_async(password)
+        except PasswordHasherBusy:
+            raise HTTPException(status_code=503, detail="Server is busy, please try again shortly", headers={"Retry-After": "1"})
+
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        try:
+            return await verify_password_async(plain_password, hashed_password)
+        except PasswordHasherBusy:
+            raise HTTPException(status_code=503, detail="Server is busy, please try again shortly", headers={"Retry-After": "1"})
 
     async def create_user(self, user_data: UserCreate, country: str, verified: bool = False) -> UserData:
         existing_user = await self.repository.get_by_email(user_data.email)
@@ -26,11 +75,11 @@ class UserService:
             existing_user.first_name = user_data.first_name
             existing_user.last_name = user_data.last_name
             existing_user.avatar = user_data.avatar
-            existing_user.hashed_password = get_password_hash(user_data.password)
+            avatar_cache.pop(existing_user.id, None)
+            existing_user.hashed_password = await self._hash_password(user_data.password)
             return await self.repository.create_or_update_user(existing_user)
         else:
-            hashed_password = get_password_hash(user_data.password)
-            stripe_customer_id = await get_stripe_customer_id(user_data.email)
+            hashed_password = await self._hash_password(user_data.password)
             new_user = User(
                 email=user_data.email,
                 first_name=user_data.first_name,
@@ -38,11 +87,46 @@ class UserService:
                 avatar = user_data.avatar,
                 country = country,
                 hashed_password=hashed_password, 
-                stripe_customer_id=stripe_customer_id,
                 verified=verified
             )
             return await self.repository.create_or_update_user(new_user)
     
+    async def ensure_stripe_customer_id(self, email: str) -> str:
+        """Return the user's Stripe customer, provisioning it now for billing flows that cannot wait for the jobs server.
+
+        Takes the same stripe_claimed_until lease as the provisioner, so no row lock is held while Stripe is called.
+        When another worker holds the lease, this re-reads the row until that worker's result lands.
+        """
+        deadline = time.monotonic() + settings.STRIPE_ENSURE_WAIT
+        while True:
+            user = await self.repository.get_fresh_by_email(email)
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            if user.stripe_customer_id is not None:
+                return user.stripe_customer_id
+
+            claimed = await self.repository.claim_pending_stripe_customers(1, settings.STRIPE_ENSURE_LEASE, only=[user.id])
+            if claimed:
+                user = claimed[0]
+                break
+            if time.monotonic() >= deadline:
+                # The holder may only be backing off after a failure; customer lookup and creation are keyed by
+                # email, so resolving it here as well cannot create a second customer
+                break
+            await asyncio.sleep(settings.STRIPE_ENSURE_POLL_INTERVAL)
+
+        try:
+            customer_id = await get_stripe_customer_id(user.email)
+        except Exception:
+            if claimed:
+                user.stripe_claimed_until = None
+                await self.repository.save_users([user])
+            raise
+        user.stripe_customer_id = customer_id
+        user.stripe_claimed_until = None
+        await self.repository.save_users([user])
+        return customer_id
+
     async def login_user(self, user_data: UserLogin) -> Token:
         existing_user = await self.repository.get_by_email(user_data.email)
         if not existing_user:
@@ -52,23 +136,14 @@ class UserService:
         if not existing_user.verified:
             raise HTTPException(status_code=403, detail="Email is not verified")
 
-        logined = verify_password(user_data.password, existing_user.hashed_password)
+        logined = await self._verify_password(user_data.password, existing_user.hashed_password)
         if not logined:
             raise HTTPException(status_code=401, detail="Password is not correct")
         
-        return create_auth_token({
-            "id": existing_user.id,
-            "email": existing_user.email,
-            "first_name": existing_user.first_name,
-            "last_name": existing_user.last_name,
-            "avatar": existing_user.avatar,
-            "country": existing_user.country,
-            "role": existing_user.role.value,
-            "tier": existing_user.tier.value,
-            "verified": existing_user.verified,
-            "blocked": existing_user.blocked
-        })
+        avatar_cache[existing_user.id] = existing_user.avatar
+        return create_auth_token(get_user_claims(existing_user))
 
+    @_single_flight
     async def get_token_by_email(self, user_data: UserCreate, country: str) -> Token:
         existing_user = await self.repository.get_by_email(user_data.email)
         if not existing_user:
@@ -77,48 +152,42 @@ class UserService:
         if existing_user.blocked:
             raise HTTPException(status_code=402, detail="Email is blocked")
 
-        return create_auth_token({
-            "id": existing_user.id,
-            "email": existing_user.email,
-            "first_name": existing_user.first_name,
-            "last_name": existing_user.last_name,
-            "avatar": existing_user.avatar,
-            "country": existing_user.country,
-            "role": existing_user.role.value,
-            "tier": existing_user.tier.value,
-            "verified": existing_user.verified,
-            "blocked": existing_user.blocked
-        })
+        avatar_cache[existing_user.id] = existing_user.avatar
+        return create_auth_token(get_user_claims(existing_user))
 
+    async def get_user_profile(self, user_data: UserData) -> UserData:
+        # Compact tokens leave the avatar out; the user row is only read when this worker has not seen it yet
+        if user_data.avatar is not None:
+            return user_data
+        if user_data.id in avatar_cache:
+            avatar = avatar_cache[user_data.id]
+        else:
+            existing_user = await self.repository.get_by_email(user_data.email)
+            avatar = existing_user.avatar if existing_user else None
+            avatar_cache[user_data.id] = avatar
+        if not avatar:
+            return user_data
+        return user_data.model_copy(update={"avatar": avatar})
+
+    @_single_flight
     async def send_verification_link_for_create(self, user_data: UserCreate, country: str):
         new_user = await self.create_user(user_data, country)
 
         if new_user.blocked:
             raise HTTPException(status_code=402, detail="Email is blocked")
             
-        token = create_verify_token({
-            "id": new_user.id,
-            "email": new_user.email,
-            "first_name": new_user.first_name,
-            "last_name": new_user.last_name,
-            "avatar": new_user.avatar,
-            "country": country,
-            "role": new_user.role.value,
-            "tier": new_user.tier.value,
-            "verified": new_user.verified,
-            "blocked": new_user.blocked
-        })
+        # An existing unverified row keeps its old country, the token carries the one from this request
+        token = create_verify_token(get_user_claims(new_user, country))
         try:
-            await run_in_threadpool(
-                send_verification_email_for_create_account,
-                new_user.email,
-                new_user.first_name,
-                new_user.last_name,
-                f"https://{settings.DOMAIN}/verify?token={token.token}&target=register"
-            )
+            await self.outbox.enqueue(EmailTemplate.VERIFY_CREATE_ACCOUNT, new_user.email, {
+                "first_name": new_user.first_name,
+                "last_name": new_user.last_name,
+                "verification_url": f"https://{settings.DOMAIN}/verify?token={token.token}&target=register"
+            })
         except:
             raise HTTPException(status_code=500, detail="Failed to send verification email")
 
+    @_single_flight
     async def send_verification_link_for_repwd(self, user_data: UserBase):
         existing_user = await self.repository.get_by_email(user_data.email)
         if not existing_user:
@@ -126,29 +195,17 @@ class UserService:
         if existing_user.blocked:
             raise HTTPException(status_code=402, detail="Email is blocked")
 
-        token = create_verify_token({
-            "id": existing_user.id,
-            "email": existing_user.email,
-            "first_name": existing_user.first_name,
-            "last_name": existing_user.last_name,
-            "avatar": existing_user.avatar,
-            "country": existing_user.country,
-            "role": existing_user.role.value,
-            "tier": existing_user.tier.value,
-            "verified": existing_user.verified,
-            "blocked": existing_user.blocked
-        })
+        token = create_verify_token(get_user_claims(existing_user))
         try:
-            await run_in_threadpool(
-                send_verification_email_for_reset_password,
-                existing_user.email,
-                existing_user.first_name,
-                existing_user.last_name,
-                f"https://{settings.DOMAIN}/verify?token={token.token}&target=repwd"
-            )
+            await self.outbox.enqueue(EmailTemplate.VERIFY_RESET_PASSWORD, existing_user.email, {
+                "first_name": existing_user.first_name,
+                "last_name": existing_user.last_name,
+                "verification_url": f"https://{settings.DOMAIN}/verify?token={token.token}&target=repwd"
+            })
         except:
             raise HTTPException(status_code=500, detail="Failed to send verification email")
 
+    @_single_flight
     async def verify_email(self, user_data: UserData):
         existing_user = await self.repository.get_by_email(user_data.email)
         if not existing_user:
@@ -159,19 +216,9 @@ class UserService:
         existing_user.verified = True
         updated_user = await self.repository.create_or_update_user(existing_user)
         
-        return create_auth_token({
-            "id": updated_user.id,
-            "email": updated_user.email,
-            "first_name": updated_user.first_name,
-            "last_name": updated_user.last_name,
-            "avatar": updated_user.avatar,
-            "country": updated_user.country,
-            "role": updated_user.role.value,
-            "tier": updated_user.tier.value,
-            "verified": updated_user.verified,
-            "blocked": updated_user.blocked
-        })
+        return create_auth_token(get_user_claims(updated_user))
         
+    @_single_flight
     async def reset_password(self, user_data: UserLogin):
         existing_user = await self.repository.get_by_email(user_data.email)
         if not existing_user:
@@ -179,7 +226,7 @@ class UserService:
         if existing_user.blocked:
             raise HTTPException(status_code=402, detail="Email is blocked")
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await self._hash_password(user_data.password)
         existing_user.hashed_password = hashed_password
         await self.repository.create_or_update_user(existing_user)
         
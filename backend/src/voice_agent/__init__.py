@@ -1,5 +1,9 @@
+from .openai_pool import openai_pool
+from .sessions import agent_sessions
 from .portfolio_agent_plugin import PortfolioAgentPlugin
 
 __all__ = [
+    "openai_pool",
+    "agent_sessions",
     "PortfolioAgentPlugin"
 ]
\ No newline at end of file
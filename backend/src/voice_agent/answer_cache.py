@@ -0,0 +1,125 @@
+import hashlib
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+
+from src.config import settings
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+# Figures, addresses and first-person statements carry the visitor's own details, which must never be replayed to someone else
+_PERSONAL = re.compile(r"\d|@|\b(my|mine|our|ours|i'm|i am|we're|we are|call me)\b", re.IGNORECASE)
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+def _vectorize(text: str) -> tuple[Counter, float]:
+    padded = f" {text} "
+    vector = Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+    return vector, math.sqrt(sum(count * count for count in vector.values()))
+
+def _cosine(a: Counter, a_norm: float, b: Counter, b_norm: float) -> float:
+    if not a_norm or not b_norm:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(count * b[gram] for gram, count in a.items() if gram in b) / (a_norm * b_norm)
+
+class AnswerCache:
+    """Finished answers indexed by character trigrams of the utterance, so near-identical questions skip the LLM.
+
+    Entries are scoped to a context key derived from the conversation so far, so an answer is only replayed
+    to a visitor whose conversation up to that point is identical, typically the opening question after the greeting.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 3600,
+        threshold: float = 0.85,
+        min_words: int = 3
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.min_words = min_words
+        self.fingerprint: str | None = None
+        self.hits = 0
+        self.misses = 0
+        # (context, normalized utterance) -> (vector, norm, answer, expires_at), oldest first
+        self._entries: OrderedDict[tuple[str, str], tuple[Counter, float, str, float]] = OrderedDict()
+
+    @staticmethod
+    def make_fingerprint(*parts: str) -> str:
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _check_fingerprint(self, fingerprint: str):
+        # A changed prompt or model makes every stored answer suspect
+        if fingerprint != self.fingerprint:
+            self._entries.clear()
+            self.fingerprint = fingerprint
+
+    def _cacheable(self, utterance: str, text: str) -> bool:
+        # Short replies like "yes" or "tell me more" only make sense in their conversation
+        return text.count(" ") + 1 >= self.min_words and not _PERSONAL.search(utterance)
+
+    def get(self, fingerprint: str, context: str, utterance: str) -> str | None:
+        self._check_fingerprint(fingerprint)
+        text = normalize(utterance)
+        if not self._cacheable(utterance, text):
+            return None
+
+        now = time.monotonic()
+        entry = self._entries.get((context, text))
+        if entry is not None and entry[3] > now:
+            self.hits += 1
+            return entry[2]
+
+        vector, norm = _vectorize(text)
+        best, best_score = None, self.threshold
+        for key, (entry_vector, entry_norm, answer, expires_at) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[key]
+                continue
+            if key[0] != context:
+                continue
+            score = _cosine(vector, norm, entry_vector, entry_norm)
+            if score >= best_score:
+                best, best_score = answer, score
+
+        if best is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best
+
+    def set(self, fingerprint: str, context: str, utterance: str, answer: str):
+        self._check_fingerprint(fingerprint)
+        text = normalize(utterance)
+        if not self._cacheable(utterance, text) or not answer:
+            return
+        vector, norm = _vectorize(text)
+        key = (context, text)
+        self._entries.pop(key, None)
+        self._entries[key] = (vector, norm, answer, time.monotonic() + self.ttl)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+
+answer_cache = AnswerCache(
+    maxsize=settings.AGENT_ANSWER_CACHE_SIZE,
+    ttl=settings.AGENT_ANSWER_CACHE_TTL,
+    threshold=settings.AGENT_ANSWER_CACHE_THRESHOLD
+)
@@ -0,0 +1,164 @@
+import asyncio
+import functools
+import logging
+import sys
+from collections import deque
+import openai
+
+logger = logging.getLogger(__name__)
+
+# Role and separator tokens the chat format adds around every message
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation between a portfolio site visitor and its assistant. "
+    "Keep names, contact details, requirements, budgets and open questions. "
+    "Answer with the summary only, in a few short sentences."
+)
+
+@functools.cache
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # Without tiktoken, English text averages about four characters per token
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+class ConversationMemory:
+    """Recent turns kept under a prompt token budget, with the oldest folded into a running summary off the reply path.
+
+    Turns are evicted in blocks that bring the history down to `retain_ratio` of the budget, and a block stays in
+    the prompt until its summary replaces it in one edit. The history therefore only changes at its front once per
+    block, leaving the provider's prompt cache a long stable prefix for every turn in between.
+    """
+
+    def __init__(
+        self,
+        openai_client: openai.AsyncOpenAI,
+        model: str,
+        token_budget: int = 2000,
+        summary_max_tokens: int = 200,
+        retain_ratio: float = 0.5
+    ):
+        self.openai_client = openai_client
+        self.model = model
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.retain_ratio = retain_ratio
+        self.summary: str | None = None
+        self.summaries = 0
+        # Summary message (once there is one) followed by the turns, edited in place as turns come and go
+        self._messages: list[dict[str, str]] = []
+        self._summary_offset = 0
+        self._turn_tokens: deque[int] = deque()
+        self._tokens = 0
+        self._summary_tokens = 0
+        self._bytes = 0
+        self._summary_task: asyncio.Task | None = None
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens + self._summary_tokens
+
+    def _count(self, message: dict[str, str]) -> int:
+        return count_tokens(message["content"], self.model) + MESSAGE_OVERHEAD
+
+    @staticmethod
+    def _size(message: dict[str, str]) -> int:
+        return sys.getsizeof(message) + sys.getsizeof(message["content"])
+
+    def add_turn(self, user: str, assistant: str):
+        turn = [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+        tokens = sum(self._count(message) for message in turn)
+        self._messages.extend(turn)
+        self._turn_tokens.append(tokens)
+        self._tokens += tokens
+        self._bytes += sum(self._size(message) for message in turn)
+
+        if self.tokens <= self.token_budget or self._summary_task is not None:
+            return
+        # The latest turn always stays, even when it alone is over the retained share
+        retained = self.tokens
+        evicted = 0
+        while retained > self.token_budget * self.retain_ratio and evicted < len(self._turn_tokens) - 1:
+            retained -= self._turn_tokens[evicted]
+            evicted += 1
+        if evicted:
+            self._summary_task = asyncio.create_task(self._summarize(evicted))
+
+    def messages(self) -> list[dict[str, str]]:
+        return self._messages
+
+    def _replace_block(self, turns: int, summary: str | None):
+        """Swap the oldest `turns` for the new summary in a single edit of the message list."""
+        start = self._summary_offset
+        self._bytes -= sum(self._size(message) for message in self._messages[start:start + 2 * turns])
+        del self._messages[start:start + 2 * turns]
+        for _ in range(turns):
+            self._tokens -= self._turn_tokens.popleft()
+        if summary is None:
+            return
+        self.summary = summary
+        self._summary_tokens = count_tokens(summary, self.model) + MESSAGE_OVERHEAD
+        message = {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+        if self._summary_offset:
+            self._bytes -= self._size(self._messages[0])
+            self._messages[0] = message
+        else:
+            self._messages.insert(0, message)
+            self._summary_offset = 1
+        self._bytes += self._size(message)
+
+    async def _summarize(self, turns: int):
+        start = self._summary_offset
+        block = self._messages[start:start + 2 * turns]
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in block)
+        if self.summary:
+            transcript = f"Summary so far: {self.summary}\n\n{transcript}"
+        summary = None
+        try:
+            response = await self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT},
+                    {"role": "user", "content": transcript}
+                ],
+                temperature=0,
+                max_tokens=self.summary_max_tokens
+            )
+            summary = (response.choices[0].message.content or "").strip() or None
+        except Exception as e:
+            # Losing the oldest turns is better than letting the prompt grow without bound
+            logger.warning("Conversation summary failed, dropping %d messages: %s", len(block), e)
+        finally:
+            self._summary_task = None
+        if summary is not None:
+            self.summaries += 1
+        self._replace_block(turns, summary)
+
+    async def aclose(self):
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+            self._summary_task = None
+
+    def size_bytes(self) -> int:
+        """Approximate bytes held by the stored messages, including the summary and any block awaiting it."""
+        return sys.getsizeof(self._messages) + self._bytes
+
+    def stats(self) -> dict:
+        return {
+            "turns": len(self._turn_tokens),
+            "tokens": self.tokens,
+            "summary_tokens": self._summary_tokens,
+            "summaries": self.summaries
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import socket
+import time
+from urllib.parse import urlsplit
+import httpx
+import openai
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+class OpenAIClientPool:
+    """One HTTP/2 OpenAI client shared by every agent in the process, with its connections kept warm between turns."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        ping_model: str = "gpt-4o",
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 120,
+        ping_interval: float = 30,
+        timeout: float = 30
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.ping_model = ping_model
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.ping_interval = ping_interval
+        self.timeout = timeout
+        self.pings = 0
+        self.ping_failures = 0
+        self.last_ping_seconds: float | None = None
+        self._client: openai.AsyncOpenAI | None = None
+        self._ping_task: asyncio.Task | None = None
+        self._closer_task: asyncio.Task | None = None
+        self._sessions = 0
+
+    def get_client(self) -> openai.AsyncOpenAI:
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=5)
+            )
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=http_client)
+        return self._client
+
+    def prepare(self):
+        """Build the client and resolve the API host ahead of the first job; safe to call before an event loop exists."""
+        client = self.get_client()
+        url = urlsplit(str(client.base_url))
+        try:
+            socket.getaddrinfo(url.hostname, url.port or (443 if url.scheme == "https" else 80), type=socket.SOCK_STREAM)
+        except OSError as e:
+            logger.warning("Could not resolve %s during prewarm: %s", url.hostname, e)
+
+    async def ping(self):
+        """Make a tiny authenticated request so the TCP, TLS and HTTP/2 session is open before a turn needs it."""
+        started = time.perf_counter()
+        try:
+            await self.get_client().models.retrieve(self.ping_model)
+        except Exception as e:
+            self.ping_failures += 1
+            logger.warning("OpenAI keepalive ping failed: %s", e)
+            return
+        self.pings += 1
+        self.last_ping_seconds = time.perf_counter() - started
+
+    async def _ping_loop(self):
+        while True:
+            await self.ping()
+            await asyncio.sleep(self.ping_interval)
+
+    async def _close_on_shutdown(self):
+        # The job loop cancels every pending task as it shuts down, which makes this the process-level close hook
+        try:
+            await asyncio.Future()
+        finally:
+            await self.aclose()
+
+    def start(self):
+        """Mark a session as active; the pool pings only while at least one is."""
+        self._sessions += 1
+        if self._ping_task is None:
+            self._ping_task = asyncio.create_task(self._ping_loop())
+        if self._closer_task is None:
+            self._closer_task = asyncio.create_task(self._close_on_shutdown())
+
+    async def release(self):
+        """End a session without closing the shared client, which other sessions may still be using."""
+        self._sessions = max(0, self._sessions - 1)
+        if not self._sessions and self._ping_task is not None:
+            self._ping_task.cancel()
+            self._ping_task = None
+
+    async def aclose(self):
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            self._ping_task = None
+        self._closer_task = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "sessions": self._sessions,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "last_ping_seconds": self.last_ping_seconds
+        }
+
+openai_pool = OpenAIClientPool(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL,
+    ping_model=settings.OPENAI_MODEL,
+    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+    ping_interval=settings.OPENAI_PING_INTERVAL
+)
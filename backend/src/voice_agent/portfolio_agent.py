@@ -1,14 +1,45 @@
-from collections import deque
+import logging
+import re
+import time
+import uuid
 import openai
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
 
 from src.config import settings
+from .answer_cache import AnswerCache, answer_cache
+from .memory import ConversationMemory
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*\s*|[.!?]+\s*")
+
+def _replay_chunks(answer: str, model: str):
+    """Stream a cached answer as the chunks a live completion would produce, one sentence at a time."""
+    chunk_id = f"cached-{uuid.uuid4().hex}"
+    created = int(time.time())
+    for sentence in _SENTENCE.findall(answer):
+        yield ChatCompletionChunk(
+            id=chunk_id,
+            object="chat.completion.chunk",
+            created=created,
+            model=model,
+            choices=[Choice(index=0, delta=ChoiceDelta(role="assistant", content=sentence), finish_reason=None)]
+        )
+    yield ChatCompletionChunk(
+        id=chunk_id,
+        object="chat.completion.chunk",
+        created=created,
+        model=model,
+        choices=[Choice(index=0, delta=ChoiceDelta(), finish_reason="stop")]
+    )
 
 class PortfolioAgent:
     """Manages conversation workflow and streams responses token-by-token for LiveKit."""
 
     def __init__(
         self, 
-        api_key: str,
+        openai_client: openai.AsyncOpenAI,
         first_name: str, 
         last_name: str, 
         email: str, 
@@ -17,14 +48,27 @@ class PortfolioAgent:
         telegram: str
     ):
         """Initialize the portfolio agent with detailed info."""
-        self.openai_client = openai.AsyncOpenAI(api_key=api_key)
-        self.conversation_history: deque[dict[str, str]] = deque(maxlen=9)
+        self.openai_client = openai_client
+        self.memory = ConversationMemory(
+            openai_client,
+            settings.OPENAI_MODEL,
+            token_budget=settings.AGENT_MEMORY_TOKEN_BUDGET,
+            summary_max_tokens=settings.AGENT_SUMMARY_MAX_TOKENS
+        )
         self.first_name = first_name
         self.last_name = last_name
         self.email = email
         self.phone = phone
         self.whatsapp = whatsapp
         self.telegram = telegram
+        # Rendered once and reused verbatim so every turn shares a byte-identical prefix the provider can cache.
+        # OpenAI only caches prompts of 1024 tokens or more and this one is about 575, so hits start once the
+        # summary and the stable front of the history carry the prompt past that floor.
+        self.system_message = {"role": "system", "content": self.get_system_prompt()}
+        # The prompt embeds the owner's details, so editing them or switching models retires cached answers
+        self.answer_fingerprint = AnswerCache.make_fingerprint(settings.OPENAI_MODEL, self.system_message["content"])
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
 
     def get_system_prompt(self) -> str:
         """Return system prompt guiding AI behavior."""
@@ -83,29 +127,65 @@ Assistant Behavior:
         """
         Process a portfolio agent and yield assistant response tokens in real-time.
         """
-        messages: list[dict[str, str]] = [
-            {"role": "system", "content": self.get_system_prompt()}
-        ]
+        if settings.AGENT_ANSWER_CACHE_ENABLED:
+            context = self._answer_context()
+            cached = answer_cache.get(self.answer_fingerprint, context, message)
+            if cached is not None:
+                for chunk in _replay_chunks(cached, settings.OPENAI_MODEL):
+                    yield chunk
+                self.memory.add_turn(message, cached)
+                return
 
-        messages.extend(self.conversation_history)
-
-        messages.append({"role": "user", "content": message})
+        messages = [self.system_message, *self.memory.messages(), {"role": "user", "content": message}]
 
         stream = await self.openai_client.chat.completions.create(
-            model="gpt-4o",
+            model=settings.OPENAI_MODEL,
             messages=messages,
             temperature=0.7,
             max_tokens=1000,
-            stream=True
+            stream=True,
+            stream_options={"include_usage": True}
         )
 
-        full_text = ""
+        parts: list[str] = []
+        finished = False
         async for chunk in stream:
             yield chunk
+            if chunk.usage is not None:
+                self._record_usage(chunk.usage)
+            # The usage chunk that closes the stream carries no choices
+            if not chunk.choices:
+                continue
             delta = chunk.choices[0].delta
             if delta.content:
-                token = delta.content
-                full_text += token
-
-        self.conversation_history.append({"role": "user", "content": message})
-        self.conversation_history.append({"role": "assistant", "content": full_text})
\ No newline at end of file
+                parts.append(delta.content)
+            if chunk.choices[0].finish_reason == "stop":
+                finished = True
+
+        full_text = "".join(parts)
+        self.memory.add_turn(message, full_text)
+        # Answers cut off by max_tokens or a dropped stream are not worth replaying
+        if settings.AGENT_ANSWER_CACHE_ENABLED and finished:
+            answer_cache.set(self.answer_fingerprint, context, message, full_text)
+
+    def _answer_context(self) -> str:
+        # Any difference in the conversation so far, including a summary, keeps answers from crossing between visitors
+        return AnswerCache.make_fingerprint(*(f"{message['role']}:{message['content']}" for message in self.memory.messages()))
+
+    def _record_usage(self, usage):
+        details = usage.prompt_tokens_details
+        cached = (details.cached_tokens if details else 0) or 0
+        self.prompt_tokens += usage.prompt_tokens
+        self.cached_tokens += cached
+        logger.info("Turn used %d prompt tokens, %d served from the prompt cache", usage.prompt_tokens, cached)
+
+    async def aclose(self):
+        await self.memory.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+            **self.memory.stats()
+        }
\ No newline at end of file
@@ -14,23 +14,16 @@ from livekit.agents.types import (
 from openai.types.chat.chat_completion_chunk import Choice
 import openai
 
-from src.config import settings
-from .portfolio_agent import PortfolioAgent
+from .segmenter import PhraseSegmenter
+from .sessions import agent_sessions
 
 class PortfolioAgentPlugin(llm.LLM):
     def __init__(
-        self
+        self,
+        session_id: str
     ):
         super().__init__()
-        self.conversation_manager = PortfolioAgent(
-            settings.OPENAI_API_KEY,
-            settings.FIRST_NAME,
-            settings.LAST_NAME,
-            settings.EMAIL_ADDRESS,
-            settings.PHONE_NUMBER,
-            settings.WHATSAPP,
-            settings.TELEGRAM
-        )
+        self.session_id = session_id
 
     def chat(
         self,
@@ -47,7 +40,7 @@ class PortfolioAgentPlugin(llm.LLM):
             chat_ctx=chat_ctx,
             tools=tools,
             conn_options=conn_options,
-            conversation_manager=self.conversation_manager
+            session_id=self.session_id
         )
 
 class LLMStream(llm.LLMStream):
@@ -58,10 +51,10 @@ class LLMStream(llm.LLMStream):
         chat_ctx: ChatContext,
         tools: list[FunctionTool | RawFunctionTool],
         conn_options: APIConnectOptions,
-        conversation_manager: PortfolioAgent
+        session_id: str
     ) -> None:
         super().__init__(llm, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
-        self._conversation_manager = conversation_manager
+        self._session_id = session_id
 
     async def _run(self) -> None:
         try:
@@ -72,36 +65,80 @@ class LLMStream(llm.LLMStream):
             self._tool_index: int | None = None
             retryable = True
 
-            stream = self._conversation_manager.process_message(
-                message=chat_ctx[0][-1]["content"]
-            )
-
-            thinking = asyncio.Event()
-            async for chunk in stream:
-                for choice in chunk.choices:
-                    chat_chunk = self._parse_choice(chunk.id, choice, thinking)
-                    if chat_chunk is not None:
+            async with agent_sessions.hold(self._session_id) as agent:
+                stream = agent.process_message(
+                    message=chat_ctx[0][-1]["content"]
+                )
+
+                thinking = asyncio.Event()
+                segmenter = PhraseSegmenter()
+                chunk_id = ""
+                async for chunk in self._chunks_or_timeouts(stream, segmenter):
+                    if chunk is None:
+                        self._send_phrase(chunk_id, segmenter.flush_due())
+                        continue
+                    chunk_id = chunk.id
+                    for choice in chunk.choices:
+                        chat_chunk = self._parse_choice(chunk.id, choice, thinking)
+                        if chat_chunk is None:
+                            continue
                         retryable = False
-                        self._event_ch.send_nowait(chat_chunk)
-
-                if chunk.usage is not None:
-                    retryable = False
-                    tokens_details = chunk.usage.prompt_tokens_details
-                    cached_tokens = tokens_details.cached_tokens if tokens_details else 0
-                    chunk = llm.ChatChunk(
-                        id=chunk.id,
-                        usage=llm.CompletionUsage(
-                            completion_tokens=chunk.usage.completion_tokens,
-                            prompt_tokens=chunk.usage.prompt_tokens,
-                            prompt_cached_tokens=cached_tokens or 0,
-                            total_tokens=chunk.usage.total_tokens,
-                        ),
-                    )
-                    self._event_ch.send_nowait(chunk)
+                        if chat_chunk.delta.tool_calls:
+                            # Text that came before the call goes out first
+                            self._send_phrase(chunk.id, segmenter.flush())
+                            self._event_ch.send_nowait(chat_chunk)
+                        else:
+                            self._send_phrase(chunk.id, segmenter.push(chat_chunk.delta.content))
+
+                    if chunk.usage is not None:
+                        retryable = False
+                        self._send_phrase(chunk.id, segmenter.flush())
+                        tokens_details = chunk.usage.prompt_tokens_details
+                        cached_tokens = tokens_details.cached_tokens if tokens_details else 0
+                        chunk = llm.ChatChunk(
+                            id=chunk.id,
+                            usage=llm.CompletionUsage(
+                                completion_tokens=chunk.usage.completion_tokens,
+                                prompt_tokens=chunk.usage.prompt_tokens,
+                                prompt_cached_tokens=cached_tokens or 0,
+                                total_tokens=chunk.usage.total_tokens,
+                            ),
+                        )
+                        self._event_ch.send_nowait(chunk)
+
+                self._send_phrase(chunk_id, segmenter.flush())
         
         except openai.APITimeoutError:
             raise APITimeoutError(retryable=retryable) from None
                     
+    async def _chunks_or_timeouts(self, stream, segmenter: PhraseSegmenter):
+        """Yield the stream's chunks, and None whenever buffered text falls due while the next chunk is still coming."""
+        chunks = aiter(stream)
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(chunks))
+                try:
+                    # Shielded so a timeout leaves the read in flight instead of cancelling the stream
+                    chunk = await asyncio.wait_for(asyncio.shield(pending), timeout=segmenter.remaining_delay())
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                except StopAsyncIteration:
+                    return
+                pending = None
+                yield chunk
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    def _send_phrase(self, id: str, phrase: str | None):
+        if phrase:
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=id, delta=llm.ChoiceDelta(content=phrase, role="assistant"))
+            )
+
     def _parse_choice(
         self, id: str, choice: Choice, thinking: asyncio.Event
     ) -> llm.ChatChunk | None:
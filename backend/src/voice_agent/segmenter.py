@@ -0,0 +1,85 @@
+import re
+import time
+
+# Clause punctuation (plus any closing quote or bracket) that is followed by whitespace
+_BOUNDARY = re.compile(r"[.!?;:,\n][\"')\]]*\s+")
+
+class PhraseSegmenter:
+    """Coalesces streamed text deltas into speakable phrases, cut at clause boundaries or when text has waited too long."""
+
+    def __init__(
+        self,
+        min_chars: int = 24,
+        first_min_words: int = 3,
+        max_chars: int = 200,
+        max_delay: float = 1.0
+    ):
+        self.min_chars = min_chars
+        self.first_min_words = first_min_words
+        self.max_chars = max_chars
+        self.max_delay = max_delay
+        self.deltas = 0
+        self.phrases = 0
+        self._buffer = ""
+        self._started_at = 0.0
+
+    def _cut_point(self) -> int:
+        text = self._buffer
+        boundary = 0
+        for match in _BOUNDARY.finditer(text):
+            boundary = match.end()
+
+        if self.phrases == 0:
+            # Speech can start as soon as there is anything sayable, so the first phrase skips the minimum length
+            if boundary:
+                return boundary
+            if len(text.split()) > self.first_min_words:
+                return text.rfind(" ") + 1
+            return 0
+
+        if boundary >= self.min_chars:
+            return boundary
+        if len(text) >= self.max_chars:
+            # No clause end in sight, so break between words rather than mid-word
+            return boundary or text.rfind(" ") + 1
+        # A stream that has stalled mid-clause is spoken between words, but a short clause already in the
+        # buffer waits for the next boundary instead of being split off on its own
+        if not boundary and len(text) >= self.min_chars and time.monotonic() - self._started_at >= self.max_delay:
+            return text.rfind(" ") + 1
+        return 0
+
+    def push(self, text: str) -> str | None:
+        """Add a delta and return a phrase if one is ready to be spoken."""
+        self.deltas += 1
+        if not self._buffer:
+            self._started_at = time.monotonic()
+        self._buffer += text
+
+        return self._take(self._cut_point())
+
+    def remaining_delay(self) -> float | None:
+        """Seconds until buffered text is due to be spoken without a new delta, or None when nothing is waiting on time."""
+        if not self._buffer:
+            return None
+        remaining = self._started_at + self.max_delay - time.monotonic()
+        # Past the deadline the delay rule has already had its say; only a new delta can change the answer
+        return remaining if remaining > 0 else None
+
+    def flush_due(self) -> str | None:
+        """Return a phrase if the buffered text has waited max_delay, for when the stream stalls between deltas."""
+        return self._take(self._cut_point())
+
+    def _take(self, cut: int) -> str | None:
+        if cut <= 0:
+            return None
+        phrase, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        self._started_at = time.monotonic()
+        self.phrases += 1
+        return phrase
+
+    def flush(self) -> str | None:
+        phrase, self._buffer = self._buffer, ""
+        if not phrase:
+            return None
+        self.phrases += 1
+        return phrase
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from src.config import settings
+from src.core import get_rss_bytes
+from .openai_pool import openai_pool
+from .portfolio_agent import PortfolioAgent
+
+logger = logging.getLogger(__name__)
+
+class _Session:
+    __slots__ = ("agent", "lock", "holders", "size")
+
+    def __init__(self, agent: PortfolioAgent):
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.holders = 0
+        # Memory size as of the end of the last turn, kept so the pool total never needs a full recount
+        self.size = agent.memory.size_bytes()
+
+class AgentSessionPool:
+    """PortfolioAgent state per LiveKit session, so concurrent rooms in one worker never share history.
+
+    A session lives until its room shuts down and calls close(). The memory cap is only a safety valve:
+    past it, the least recently used sessions that are not mid-turn lose their history.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], PortfolioAgent],
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        stats_interval: float = 60
+    ):
+        self.factory = factory
+        self.max_memory_bytes = max_memory_bytes
+        self.stats_interval = stats_interval
+        self.created = 0
+        self.evicted = 0
+        # Least recently used first
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        self._memory_bytes = 0
+        self._stats_task: asyncio.Task | None = None
+        self._closing: set[asyncio.Task] = set()
+
+    def _get(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session(self.factory())
+            self._memory_bytes += session.size
+            self.created += 1
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _remove(self, session_id: str) -> _Session | None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._memory_bytes -= session.size
+        return session
+
+    def _evict(self, session_id: str):
+        session = self._remove(session_id)
+        self.evicted += 1
+        task = asyncio.create_task(session.agent.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+        logger.warning("Evicted agent session %s over the %d byte memory cap", session_id, self.max_memory_bytes)
+
+    def _update_size(self, session: _Session):
+        size = session.agent.memory.size_bytes()
+        self._memory_bytes += size - session.size
+        session.size = size
+
+    def _enforce_memory_cap(self):
+        # Sessions mid-turn are never evicted, so the cap is soft while every session is busy
+        if self._memory_bytes <= self.max_memory_bytes:
+            return
+        for session_id, session in list(self._sessions.items()):
+            if self._memory_bytes <= self.max_memory_bytes:
+                break
+            if not session.holders:
+                self._evict(session_id)
+
+    async def _stats_loop(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            if self._sessions:
+                stats = self.stats()
+                logger.info(
+                    "Agent sessions: %d held, %d bytes of state, %d bytes RSS",
+                    stats["sessions"], stats["memory_bytes"], stats["rss_bytes"]
+                )
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        """Yield the session's agent with its lock held, so overlapping turns in one room run one at a time."""
+        if self._stats_task is None:
+            self._stats_task = asyncio.create_task(self._stats_loop())
+        session = self._get(session_id)
+        session.holders += 1
+        try:
+            async with session.lock:
+                yield session.agent
+        finally:
+            session.holders -= 1
+            if self._sessions.get(session_id) is session:
+                self._update_size(session)
+                self._enforce_memory_cap()
+
+    async def close(self, session_id: str):
+        session = self._remove(session_id)
+        if session is not None:
+            await session.agent.aclose()
+
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "busy": sum(1 for session in self._sessions.values() if session.holders),
+            "created": self.created,
+            "evicted": self.evicted,
+            "memory_bytes": self._memory_bytes,
+            "rss_bytes": get_rss_bytes()
+        }
+
+def _create_agent() -> PortfolioAgent:
+    return PortfolioAgent(
+        openai_pool.get_client(),
+        settings.FIRST_NAME,
+        settings.LAST_NAME,
+        settings.EMAIL_ADDRESS,
+        settings.PHONE_NUMBER,
+        settings.WHATSAPP,
+        settings.TELEGRAM
+    )
+
+agent_sessions = AgentSessionPool(
+    _create_agent,
+    max_memory_bytes=settings.AGENT_SESSIONS_MAX_MEMORY_MB * 1024 * 1024
+)
@@ -0,0 +1,42 @@
+import threading
+import time
+
+from src.core import VerifiedClaimsCache
+
+THREADS = 8
+CALLS = 5000
+
+def test_concurrent_access_from_threads():
+    # Small enough that the threads keep evicting each other's entries
+    cache = VerifiedClaimsCache(maxsize=64)
+    expires_at = time.time() + 60
+    errors = []
+    start = threading.Barrier(THREADS)
+
+    def hammer(worker: int):
+        start.wait()
+        try:
+            for i in range(CALLS):
+                token = f"token-{worker}-{i % 200}"
+                if cache.get(token) is None:
+                    cache.set(token, {"worker": worker}, expires_at)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(worker,)) for worker in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert errors == []
+    assert stats["hits"] + stats["misses"] == THREADS * CALLS
+    assert stats["size"] <= 64
+
+def test_entries_expire_with_their_token():
+    cache = VerifiedClaimsCache()
+    cache.set("expired", {"a": 1}, time.time() - 1)
+    cache.set("live", {"b": 2}, time.time() + 60)
+    assert cache.get("expired") is None
+    assert cache.get("live") == {"b": 2}
@@ -0,0 +1,24 @@
+import pytest
+from starlette.requests import Request
+
+from src.config import settings
+from src.dependencies import get_client_ip
+
+def request_from(client: str, forwarded_for: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for is not None else []
+    return Request({"type": "http", "headers": headers, "client": (client, 1234)})
+
+@pytest.fixture
+def trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", 1)
+
+def test_spoofed_first_hop_is_ignored(trusted_proxies):
+    assert get_client_ip(request_from("10.0.0.2", "1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+
+def test_missing_header_falls_back_to_the_peer(trusted_proxies):
+    assert get_client_ip(request_from("203.0.113.7")) == "203.0.113.7"
+    assert get_client_ip(request_from("203.0.113.7", "")) == "203.0.113.7"
+
+def test_header_is_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", 0)
+    assert get_client_ip(request_from("203.0.113.7", "1.2.3.4")) == "203.0.113.7"
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import time
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.core import OIDCProviderCache
+
+class OIDCStand:
+    """Discovery and JWKS endpoints with a configurable max-age and a key that can be rotated."""
+
+    def __init__(self, max_age: int = 3600):
+        self.max_age = max_age
+        self.kid = "key-1"
+        self.discovery_fetches = 0
+        self.app = Starlette(routes=[
+            Route("/.well-known/openid-configuration", self.discovery),
+            Route("/jwks", self.jwks)
+        ])
+
+    def _headers(self) -> dict:
+        return {"Cache-Control": f"public, max-age={self.max_age}"}
+
+    async def discovery(self, request: Request):
+        self.discovery_fetches += 1
+        base = str(request.base_url).rstrip("/")
+        return JSONResponse({"issuer": base, "jwks_uri": f"{base}/jwks"}, headers=self._headers())
+
+    async def jwks(self, request: Request):
+        return JSONResponse({"keys": [{"kid": self.kid, "kty": "RSA", "n": "AQAB", "e": "AQAB"}]}, headers=self._headers())
+
+@pytest.fixture
+def oidc_stand(serve):
+    stand = OIDCStand()
+    stand.issuer = serve(stand.app)
+    return stand
+
+def make_cache(stand: OIDCStand, path, **kwargs) -> OIDCProviderCache:
+    return OIDCProviderCache(stand.issuer, cache_path=str(path), **kwargs)
+
+def kids(cache: OIDCProviderCache) -> list[str]:
+    return [key["kid"] for key in cache.jwks["keys"]]
+
+async def test_loads_a_fresh_copy_from_disk_without_fetching(oidc_stand, tmp_path):
+    await make_cache(oidc_stand, tmp_path / "oidc.json").ensure()
+    assert oidc_stand.discovery_fetches == 1
+
+    # A second worker starting up adopts the file instead of going to the network
+    other = make_cache(oidc_stand, tmp_path / "oidc.json")
+    other.start()
+    try:
+        metadata, _ = await other.ensure()
+        await asyncio.sleep(0.2)
+    finally:
+        other.stop()
+    assert metadata["jwks_uri"] == f"{oidc_stand.issuer}/jwks"
+    assert kids(other) == ["key-1"]
+    assert oidc_stand.discovery_fetches == 1
+
+async def test_refreshes_ahead_of_expiry(oidc_stand, tmp_path):
+    oidc_stand.max_age = 2
+    cache = make_cache(oidc_stand, tmp_path / "oidc.json", refresh_margin=1, stagger=0)
+    await cache.ensure()
+    expires_at = cache.expires_at
+
+    cache.start()
+    try:
+        deadline = time.monotonic() + 5
+        while cache.fetches < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+    finally:
+        cache.stop()
+    assert cache.fetches >= 2
+    assert cache.expires_at > expires_at
+
+async def test_picks_up_rotated_keys_from_another_worker(oidc_stand, tmp_path):
+    path = tmp_path / "oidc.json"
+    first = make_cache(oidc_stand, path)
+    second = make_cache(oidc_stand, path)
+    await first.ensure()
+    await second.ensure()
+    assert kids(second) == ["key-1"]
+
+    oidc_stand.kid = "key-2"
+    await first.refresh()
+    assert kids(first) == ["key-2"]
+
+    # The rotated copy on disk expires later, so the other worker adopts it without a fetch of its own
+    assert second.load()
+    assert kids(second) == ["key-2"]
+    assert second.fetches == 0
+
+async def test_workers_sharing_a_file_stagger_the_refresh(oidc_stand, tmp_path):
+    path = tmp_path / "oidc.json"
+    await make_cache(oidc_stand, path).ensure()
+    # Still valid for a minute, but already due for refresh
+    cached = json.loads(path.read_text())
+    cached["expires_at"], cached["refresh_at"] = time.time() + 60, time.time() - 1
+    path.write_text(json.dumps(cached))
+    fetches = oidc_stand.discovery_fetches
+
+    workers = [make_cache(oidc_stand, path, stagger=2) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    try:
+        await asyncio.sleep(2.5)
+    finally:
+        for worker in workers:
+            worker.stop()
+    # Without the stagger every worker would wake at once and fetch; with it the later ones adopt the first copy
+    assert 1 <= oidc_stand.discovery_fetches - fetches < len(workers)
+    assert all(kids(worker) == ["key-1"] and worker.refresh_at > time.time() for worker in workers)
@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
+import pytest
+from livekit.agents import llm
+from livekit.agents.llm.chat_context import ChatContext
+from openai.types.chat.chat_completion_chunk import ChatCompletionChunk, Choice, ChoiceDelta
+
+from src.voice_agent import portfolio_agent_plugin as plugin_module
+from src.voice_agent.portfolio_agent_plugin import PortfolioAgentPlugin, LLMStream
+from src.voice_agent.segmenter import PhraseSegmenter
+
+MAX_DELAY = 0.3
+
+def text_chunk(content: str) -> ChatCompletionChunk:
+    return ChatCompletionChunk(
+        id="chunk",
+        object="chat.completion.chunk",
+        created=0,
+        model="test",
+        choices=[Choice(index=0, delta=ChoiceDelta(content=content))]
+    )
+
+class StallingAgent:
+    """Streams a reply that stops mid-clause until the test resumes it."""
+
+    def __init__(self):
+        self.resume = asyncio.Event()
+
+    async def process_message(self, message: str):
+        yield text_chunk("Hello! ")
+        yield text_chunk("the projects I enjoy most involve")
+        await self.resume.wait()
+        yield text_chunk(" audio.")
+
+class Sessions:
+    def __init__(self, agent):
+        self.agent = agent
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        yield self.agent
+
+def parse_text(self, id: str, choice: Choice, thinking: asyncio.Event) -> llm.ChatChunk:
+    # Text only, so the test does not depend on the SDK's thinking-token filter
+    return llm.ChatChunk(id=id, delta=llm.ChoiceDelta(content=choice.delta.content, role="assistant"))
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = StallingAgent()
+    monkeypatch.setattr(plugin_module, "agent_sessions", Sessions(agent))
+    monkeypatch.setattr(LLMStream, "_parse_choice", parse_text)
+    monkeypatch.setattr(plugin_module, "PhraseSegmenter", functools.partial(PhraseSegmenter, max_delay=MAX_DELAY))
+    return agent
+
+async def test_stalled_stream_speaks_within_max_delay(agent):
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="user", content="What do you work on?")
+    phrases: list[tuple[float, str]] = []
+
+    async def consume():
+        async with PortfolioAgentPlugin("session").chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    phrases.append((time.monotonic(), chunk.delta.content))
+
+    async def first_phrase():
+        while not phrases:
+            await asyncio.sleep(0.01)
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.wait_for(first_phrase(), timeout=5)
+    first_at = phrases[0][0]
+
+    # Nothing arrives while the stream is stalled, yet the waiting text is spoken on time, short of the
+    # last word in case it is still being streamed
+    await asyncio.sleep(MAX_DELAY * 2)
+    assert [text for _, text in phrases] == ["Hello! ", "the projects I enjoy most "]
+    assert phrases[1][0] - first_at < MAX_DELAY + 0.1
+
+    agent.resume.set()
+    await asyncio.wait_for(consumer, timeout=5)
+    assert [text for _, text in phrases][2:] == ["involve audio."]
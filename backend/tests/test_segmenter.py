@@ -0,0 +1,85 @@
+import pytest
+
+from src.voice_agent import segmenter as segmenter_module
+from src.voice_agent.segmenter import PhraseSegmenter
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(segmenter_module.time, "monotonic", clock)
+    return clock
+
+def started(clock: Clock, **kwargs) -> PhraseSegmenter:
+    """A segmenter past its first phrase, so the regular cut rules apply."""
+    segmenter = PhraseSegmenter(**kwargs)
+    assert segmenter.push("Hello! ") == "Hello! "
+    return segmenter
+
+def test_first_phrase_cuts_at_any_boundary(clock):
+    segmenter = PhraseSegmenter()
+    assert segmenter.push("Hi") is None
+    assert segmenter.push(", there") == "Hi, "
+
+def test_first_phrase_without_a_boundary_cuts_after_a_few_words(clock):
+    segmenter = PhraseSegmenter(first_min_words=3)
+    assert segmenter.push("I build web") is None
+    assert segmenter.push(" apps and") == "I build web apps "
+
+def test_later_phrases_wait_for_a_boundary_past_min_chars(clock):
+    segmenter = started(clock, min_chars=24)
+    assert segmenter.push("Sure, ") is None
+    assert segmenter.push("I can help with that. Let") == "Sure, I can help with that. "
+    assert segmenter.flush() == "Let"
+
+def test_max_chars_cuts_between_words(clock):
+    segmenter = started(clock, max_chars=40)
+    assert segmenter.push("one two three four five six seven") is None
+    assert segmenter.push(" eight nine") == "one two three four five six seven eight "
+    assert segmenter.flush() == "nine"
+
+def test_stalled_stream_cuts_between_words_after_max_delay(clock):
+    segmenter = started(clock, min_chars=24, max_delay=1.0)
+    assert segmenter.push("the projects I enjoy most involve") is None
+    clock.now += 0.5
+    assert segmenter.push(" real") is None
+    clock.now += 0.6
+    assert segmenter.push("time") == "the projects I enjoy most involve "
+
+def test_max_delay_does_not_split_off_a_short_clause(clock):
+    segmenter = started(clock, min_chars=24, max_delay=1.0)
+    assert segmenter.push("Yes, and the projects I enjoy") is None
+    clock.now += 2
+    assert segmenter.push(" most") is None
+    assert segmenter.push(" involve audio. Next") == "Yes, and the projects I enjoy most involve audio. "
+
+def test_flush_returns_whatever_is_left(clock):
+    segmenter = started(clock)
+    assert segmenter.push("and that") is None
+    assert segmenter.flush() == "and that"
+    assert segmenter.flush() is None
+
+def test_flush_due_speaks_a_stalled_buffer(clock):
+    segmenter = started(clock, min_chars=24, max_delay=1.0)
+    assert segmenter.push("the projects I enjoy most involve") is None
+    assert segmenter.remaining_delay() == pytest.approx(1.0)
+    clock.now += 0.4
+    assert segmenter.flush_due() is None
+    assert segmenter.remaining_delay() == pytest.approx(0.6)
+    clock.now += 0.6
+    assert segmenter.flush_due() == "the projects I enjoy most "
+    assert segmenter.remaining_delay() == pytest.approx(1.0)
+
+def test_nothing_is_due_once_the_delay_has_passed_without_a_cut(clock):
+    segmenter = started(clock, min_chars=24, max_delay=1.0)
+    assert segmenter.remaining_delay() is None
+    assert segmenter.push("Yes, and the projects") is None
+    clock.now += 2
+    assert segmenter.flush_due() is None
+    assert segmenter.remaining_delay() is None
@@ -0,0 +1,114 @@
+import asyncio
+import socket
+import threading
+import pytest
+from aiosmtpd.controller import Controller
+
+from src.core.smtp import SMTPPool
+
+MESSAGE = b"Subject: test\r\n\r\nhello\r\n"
+
+class RecordingHandler:
+    """Records which connection delivered each message; cleared `gate` holds every DATA until it is set."""
+
+    def __init__(self):
+        self.deliveries: list[tuple] = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.in_data = 0
+        self.max_in_data = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.in_data += 1
+        self.max_in_data = max(self.max_in_data, self.in_data)
+        try:
+            await asyncio.to_thread(self.gate.wait)
+        finally:
+            self.in_data -= 1
+        self.deliveries.append(session.peer)
+        return "250 OK"
+
+    @property
+    def connections(self) -> int:
+        return len(set(self.deliveries))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class SMTPStand:
+    """aiosmtpd on a fixed local port that can be restarted, dropping every open session."""
+
+    def __init__(self):
+        self.handler = RecordingHandler()
+        self.port = free_port()
+        self._start()
+
+    def _start(self):
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+
+    def restart(self):
+        self.controller.stop()
+        self._start()
+
+    def stop(self):
+        self.handler.gate.set()
+        self.controller.stop()
+
+@pytest.fixture
+def smtp_stand():
+    stand = SMTPStand()
+    yield stand
+    stand.stop()
+
+@pytest.fixture
+async def make_pool(smtp_stand):
+    pools = []
+
+    def make(size: int = 2) -> SMTPPool:
+        pool = SMTPPool("127.0.0.1", smtp_stand.port, size=size, start_tls=False, timeout=5)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        await pool.close()
+
+async def test_reuses_one_connection_for_sequential_sends(smtp_stand, make_pool):
+    handler = smtp_stand.handler
+    pool = make_pool()
+    for _ in range(5):
+        await pool.sendmail("from@example.com", ["to@example.com"], MESSAGE)
+
+    assert len(handler.deliveries) == 5
+    assert handler.connections == 1
+
+async def test_reconnects_after_the_server_closes_the_session(smtp_stand, make_pool):
+    handler = smtp_stand.handler
+    pool = make_pool()
+    await pool.sendmail("from@example.com", ["to@example.com"], MESSAGE)
+
+    # Restarting drops the pooled session while it still looks connected to the client
+    smtp_stand.restart()
+    await pool.sendmail("from@example.com", ["to@example.com"], MESSAGE)
+
+    assert len(handler.deliveries) == 2
+    assert handler.connections == 2
+
+async def test_waits_for_a_free_connection_when_the_pool_is_exhausted(smtp_stand, make_pool):
+    handler = smtp_stand.handler
+    pool = make_pool(size=2)
+    handler.gate.clear()
+    sends = [asyncio.create_task(pool.sendmail("from@example.com", ["to@example.com"], MESSAGE)) for _ in range(5)]
+    while handler.in_data < 2:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+    assert handler.in_data == 2
+
+    handler.gate.set()
+    await asyncio.gather(*sends)
+    assert len(handler.deliveries) == 5
+    assert handler.max_in_data == 2
+    assert handler.connections == 2
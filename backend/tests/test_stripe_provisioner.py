@@ -0,0 +1,217 @@
+import asyncio
+import itertools
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs
+import pytest
+from sqlalchemy import select, update, delete, text
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.config import settings
+from src.db import AsyncSessionLocal
+from src.db.models import User
+from src.db.repositories import UserRepository
+from src.services import stripe_service, user_service
+from src.services.user_service import UserService
+from src.services.stripe_provisioner import StripeCustomerProvisioner
+
+class StripeStand:
+    """Just enough of the Stripe customers API for get_stripe_customer_id."""
+
+    def __init__(self):
+        self.customers: dict[str, dict] = {}
+        self.ids = itertools.count(1)
+        self.failing: set[str] = set()
+        self.requests = 0
+        self.created = 0
+        # Cleared to hold every request until the test lets it through
+        self.gate = threading.Event()
+        self.gate.set()
+        self.app = Starlette(routes=[
+            Route("/v1/customers", self.list_customers),
+            Route("/v1/customers", self.create_customer, methods=["POST"])
+        ])
+
+    async def list_customers(self, request):
+        self.requests += 1
+        await asyncio.to_thread(self.gate.wait)
+        email = request.query_params.get("email")
+        if email in self.failing:
+            return JSONResponse({"error": {"type": "invalid_request_error", "message": "declined"}}, status_code=400)
+        data = [customer for customer in self.customers.values() if customer["email"] == email][:1]
+        return JSONResponse({"object": "list", "data": data, "has_more": False, "url": "/v1/customers"})
+
+    async def create_customer(self, request):
+        self.created += 1
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        customer = self.add(form["email"])
+        return JSONResponse(customer)
+
+    def add(self, email: str) -> dict:
+        customer = {"id": f"cus_{next(self.ids)}", "object": "customer", "email": email}
+        self.customers[customer["id"]] = customer
+        return customer
+
+@pytest.fixture
+def stripe_stand(serve, monkeypatch):
+    stand = StripeStand()
+    monkeypatch.setattr(settings, "STRIPE_API_BASE", serve(stand.app))
+    stripe_service.get_stripe.cache_clear()
+    stripe_service.customer_id_cache.clear()
+    yield stand
+    stand.gate.set()
+    stripe_service.get_stripe.cache_clear()
+
+@pytest.fixture
+async def pending_users(database):
+    users = [
+        User(
+            email=f"stripe-{uuid.uuid4().hex}@example.com",
+            first_name="Jane",
+            last_name="Doe",
+            country="US",
+            hashed_password="x",
+            stripe_customer_id=None
+        )
+        for _ in range(3)
+    ]
+    async with AsyncSessionLocal() as db:
+        db.add_all(users)
+        await db.commit()
+    yield users
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.id.in_([user.id for user in users])))
+        await db.commit()
+
+async def reload(users: list[User]) -> list[User]:
+    async with AsyncSessionLocal() as db:
+        result = await db.scalars(select(User).where(User.id.in_([user.id for user in users])).order_by(User.id))
+        return list(result.all())
+
+async def claim_and_release(db) -> set[int]:
+    """Claim what another provisioner would right now, then hand the leases back."""
+    claimed = await UserRepository(db).claim_pending_stripe_customers(1000, 60)
+    ids = [user.id for user in claimed]
+    await db.execute(update(User).where(User.id.in_(ids)).values(stripe_claimed_until=None))
+    await db.commit()
+    return set(ids)
+
+def make_provisioner(**kwargs) -> StripeCustomerProvisioner:
+    # Large enough to take every pending user in the database along with ours
+    return StripeCustomerProvisioner(batch_size=1000, concurrency=2, lease=60, **kwargs)
+
+async def test_provisions_without_holding_row_locks(stripe_stand, pending_users):
+    stripe_stand.gate.clear()
+    batch = asyncio.create_task(make_provisioner().provision_batch())
+    while stripe_stand.requests == 0:
+        await asyncio.sleep(0.01)
+
+    async with AsyncSessionLocal() as db:
+        # Would fail straight away if the claim were still holding its FOR UPDATE lock
+        await db.execute(text("SELECT id FROM users WHERE id = :id FOR UPDATE NOWAIT"), {"id": pending_users[0].id})
+        await db.rollback()
+        assert not await claim_and_release(db) & {user.id for user in pending_users}
+
+    stripe_stand.gate.set()
+    await batch
+
+    for user in await reload(pending_users):
+        assert stripe_stand.customers[user.stripe_customer_id]["email"] == user.email
+        assert user.stripe_claimed_until is None
+
+async def test_reuses_an_existing_customer(stripe_stand, pending_users):
+    existing = stripe_stand.add(pending_users[0].email)
+    await make_provisioner().provision_batch()
+
+    users = await reload(pending_users)
+    assert users[0].stripe_customer_id == existing["id"]
+    assert stripe_stand.created == len(pending_users) - 1
+
+async def test_failed_customer_keeps_its_lease_until_the_retry(stripe_stand, pending_users):
+    stripe_stand.failing.add(pending_users[0].email)
+    provisioner = make_provisioner(retry_base=120)
+    await provisioner.provision_batch()
+
+    failed, *provisioned = await reload(pending_users)
+    assert failed.stripe_customer_id is None
+    assert failed.stripe_claimed_until > datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert all(user.stripe_customer_id is not None for user in provisioned)
+    assert provisioner.failed == 1
+
+    # Another provisioner skips it too, not just the one that recorded the backoff
+    async with AsyncSessionLocal() as db:
+        assert failed.id not in await claim_and_release(db)
+
+@pytest.fixture
+def stripe_calls(monkeypatch):
+    """Count the user service's trips into get_stripe_customer_id, below any lease but above the single-flight."""
+    calls = []
+    original = user_service.get_stripe_customer_id
+
+    async def counted(email):
+        calls.append(email)
+        return await original(email)
+
+    monkeypatch.setattr(user_service, "get_stripe_customer_id", counted)
+    return calls
+
+async def ensure(email: str) -> str:
+    async with AsyncSessionLocal() as db:
+        return await UserService(db).ensure_stripe_customer_id(email)
+
+async def test_ensure_provisions_on_demand(stripe_stand, pending_users, stripe_calls):
+    user = pending_users[0]
+    customer_id = await ensure(user.email.upper())
+
+    stored, *_ = await reload(pending_users)
+    assert stored.stripe_customer_id == customer_id
+    assert stored.stripe_claimed_until is None
+    assert stripe_stand.customers[customer_id]["email"] == user.email
+
+    # Already provisioned: answered from the row without going to Stripe
+    assert await ensure(user.email) == customer_id
+    assert len(stripe_calls) == 1
+
+async def test_racing_ensures_share_one_lease(stripe_stand, pending_users, stripe_calls):
+    stripe_stand.gate.clear()
+    first = asyncio.create_task(ensure(pending_users[0].email))
+    while stripe_stand.requests == 0:
+        await asyncio.sleep(0.01)
+    # Started while the first holds the lease, in its own session
+    second = asyncio.create_task(ensure(pending_users[0].email))
+    await asyncio.sleep(settings.STRIPE_ENSURE_POLL_INTERVAL * 3)
+    assert not second.done()
+
+    stripe_stand.gate.set()
+    assert await first == await second
+    assert len(stripe_calls) == 1
+    assert stripe_stand.created == 1
+
+async def test_ensure_waits_for_the_provisioner(stripe_stand, pending_users, stripe_calls):
+    user = pending_users[0]
+    async with AsyncSessionLocal() as db:
+        assert await UserRepository(db).claim_pending_stripe_customers(1, 60, only=[user.id])
+
+    waiting = asyncio.create_task(ensure(user.email))
+    await asyncio.sleep(settings.STRIPE_ENSURE_POLL_INTERVAL * 2)
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(User).where(User.id == user.id).values(stripe_customer_id="cus_elsewhere", stripe_claimed_until=None))
+        await db.commit()
+
+    assert await waiting == "cus_elsewhere"
+    assert not stripe_calls
+
+async def test_ensure_stops_waiting_on_a_stuck_lease(stripe_stand, pending_users, stripe_calls, monkeypatch):
+    monkeypatch.setattr(settings, "STRIPE_ENSURE_WAIT", 0.3)
+    user = pending_users[0]
+    async with AsyncSessionLocal() as db:
+        assert await UserRepository(db).claim_pending_stripe_customers(1, 60, only=[user.id])
+
+    customer_id = await ensure(user.email)
+
+    stored, *_ = await reload(pending_users)
+    assert stored.stripe_customer_id == customer_id
+    assert len(stripe_calls) == 1
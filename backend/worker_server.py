@@ -3,6 +3,7 @@ from livekit.agents import (
     Agent,
     RoomInputOptions,
     JobContext,
+    JobProcess,
     cli,
     WorkerOptions
 )
@@ -13,7 +14,7 @@ from livekit.plugins import (
 )
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
-from src.voice_agent import PortfolioAgentPlugin
+from src.voice_agent import PortfolioAgentPlugin, openai_pool, agent_sessions
 from src.config import settings
 
 
@@ -22,10 +23,20 @@ class Assistant(Agent):
         super().__init__(instructions="")
 
 
+def prewarm(proc: JobProcess):
+    # Runs before the job's event loop exists, so only build the client here and open connections in the entrypoint
+    openai_pool.prepare()
+
+
 async def entrypoint(ctx: JobContext):
+    # The handshake overlaps room setup, so the welcome reply streams over an already open connection
+    openai_pool.start()
+    ctx.add_shutdown_callback(openai_pool.release)
+    ctx.add_shutdown_callback(lambda: agent_sessions.close(ctx.room.name))
+
     session = AgentSession(
         stt=deepgram.STT(api_key=settings.DEEPGRAM_API_KEY),
-        llm=PortfolioAgentPlugin(),
+        llm=PortfolioAgentPlugin(session_id=ctx.room.name),
         tts=deepgram.TTS(api_key=settings.DEEPGRAM_API_KEY),
         vad=silero.VAD.load(),
         turn_detection=MultilingualModel(),
@@ -45,6 +56,7 @@ async def entrypoint(ctx: JobContext):
 if __name__ == "__main__":
     cli.run_app(WorkerOptions(
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
         api_key=settings.LIVEKIT_API_KEY,
         api_secret=settings.LIVEKIT_API_SECRET,
         ws_url=settings.LIVEKIT_URL